@@ -6,16 +6,22 @@ A command-line tool to detect and blur humans in images and videos using instanc
 """
 
 import argparse
+import ast
+import functools
+import inspect
 import sys
 import subprocess
 import tempfile
 import time
 import json
+import multiprocessing
+import os
+import queue
+import threading
 from pathlib import Path
-from typing import List, Tuple, Optional, Dict, Any
+from typing import List, Tuple, Optional, Dict, Any, Iterator, Callable, NamedTuple
 import cv2
 import numpy as np
-from ultralytics import YOLO
 from PIL import Image
 
 # HEIC support
@@ -26,6 +32,1176 @@ try:
 except ImportError:
     HEIC_SUPPORT = False
 
+# ONNX Runtime support (optional CPU inference engine)
+try:
+    import onnxruntime
+    ONNX_SUPPORT = True
+except ImportError:
+    ONNX_SUPPORT = False
+
+# OpenVINO support (optional CPU inference engine for Intel CPUs)
+try:
+    import openvino
+    OPENVINO_SUPPORT = True
+except ImportError:
+    OPENVINO_SUPPORT = False
+
+INFERENCE_ENGINES = ('torch', 'onnx', 'openvino')
+
+PRECISIONS = ('fp32', 'int8')
+
+BLUR_ENGINES = ('gaussian', 'box', 'pyramid')
+
+MORPHOLOGY_MODES = ('auto', 'exact', 'rect')
+
+VIDEO_IO_BACKENDS = ('ffmpeg', 'opencv')
+
+MASK_PROPAGATION_MODES = ('hold', 'flow')
+
+DETECTION_SCHEDULERS = ('fixed', 'adaptive', 'motion')
+
+MODEL_CHOICES = ['yolov8n-seg.pt', 'yolov8s-seg.pt', 'yolov8m-seg.pt', 'yolov8l-seg.pt', 'yolov8x-seg.pt',
+                 'yolov8n.pt', 'yolov8s.pt', 'yolov8m.pt', 'yolov8l.pt', 'yolov8x.pt']
+
+
+def check_choice(name: str, value: Any, choices: Tuple[str, ...]) -> None:
+    """Raise ValueError if a setting is not one of its choices."""
+    if value not in choices:
+        raise ValueError(f"{name} must be one of {', '.join(choices)}, got {value!r}")
+
+
+class ModelPrediction(NamedTuple):
+    """Engine-independent model output for one image."""
+    boxes: np.ndarray  # (N, 4) float32 boxes (x1, y1, x2, y2) in image pixels
+    scores: np.ndarray  # (N,) float32 confidences
+    classes: np.ndarray  # (N,) int class ids
+    masks: Optional[np.ndarray]  # (N, h, w) masks covering the whole image at model resolution, None for detection models
+
+
+class CropMask(NamedTuple):
+    """
+    Binary mask stored as the crop of its bounding box plus the crop's offset,
+    so memory and per-pixel work scale with the masked area, not the frame size.
+    """
+    data: np.ndarray  # (h, w) uint8 crop, 1 inside the mask
+    x: int  # Crop offset in the full mask
+    y: int
+    shape: Tuple[int, int]  # (height, width) of the full mask
+    
+    @classmethod
+    def from_array(cls, mask) -> 'CropMask':
+        """Crop a full-size binary mask to its bounding box. CropMasks are returned unchanged."""
+        if isinstance(mask, CropMask):
+            return mask
+        binary = np.ascontiguousarray(mask > 0.5).view(np.uint8)
+        x, y, w, h = cv2.boundingRect(binary)
+        return cls(binary[y:y + h, x:x + w].copy(), x, y, binary.shape[:2])
+    
+    @classmethod
+    def empty(cls, shape: Tuple[int, ...]) -> 'CropMask':
+        return cls(np.zeros((0, 0), dtype=np.uint8), 0, 0, tuple(shape[:2]))
+    
+    @classmethod
+    def union(cls, masks: List['CropMask']) -> Optional['CropMask']:
+        """Logical OR of masks with the same full shape, allocated over the union bounding box only.
+        
+        Returns None if every mask is empty.
+        """
+        masks = [mask for mask in masks if mask.data.size]
+        if not masks:
+            return None
+        if len(masks) == 1:
+            return masks[0]
+        x1 = min(mask.x for mask in masks)
+        y1 = min(mask.y for mask in masks)
+        x2 = max(mask.x + mask.data.shape[1] for mask in masks)
+        y2 = max(mask.y + mask.data.shape[0] for mask in masks)
+        data = np.zeros((y2 - y1, x2 - x1), dtype=np.uint8)
+        for mask in masks:
+            h, w = mask.data.shape
+            region = data[mask.y - y1:mask.y - y1 + h, mask.x - x1:mask.x - x1 + w]
+            np.bitwise_or(region, mask.data, out=region)
+        return cls(data, x1, y1, masks[0].shape)
+    
+    @property
+    def bbox(self) -> Tuple[int, int, int, int]:
+        """Crop rectangle (x1, y1, x2, y2) in full mask coordinates."""
+        return self.x, self.y, self.x + self.data.shape[1], self.y + self.data.shape[0]
+    
+    def padded_bbox(self, margin: int) -> Tuple[int, int, int, int]:
+        """Crop rectangle grown by margin pixels on each side, clipped to the full mask."""
+        height, width = self.shape
+        x1, y1, x2, y2 = self.bbox
+        return max(0, x1 - margin), max(0, y1 - margin), min(width, x2 + margin), min(height, y2 + margin)
+    
+    def padded(self, margin: int) -> 'CropMask':
+        """Return the same mask with its crop grown by margin pixels on each side (clipped to the full mask)."""
+        x1, y1, x2, y2 = self.bbox
+        new_x1, new_y1, new_x2, new_y2 = self.padded_bbox(margin)
+        data = np.zeros((new_y2 - new_y1, new_x2 - new_x1), dtype=np.uint8)
+        data[y1 - new_y1:y2 - new_y1, x1 - new_x1:x2 - new_x1] = self.data
+        return CropMask(data, new_x1, new_y1, self.shape)
+    
+    def to_array(self) -> np.ndarray:
+        """Expand to a full-size uint8 mask."""
+        full = np.zeros(self.shape, dtype=np.uint8)
+        x1, y1, x2, y2 = self.bbox
+        full[y1:y2, x1:x2] = self.data
+        return full
+
+
+class FrameBufferPool:
+    """
+    Reusable arrays for processing one video, so steady-state frames allocate
+    (almost) nothing. Buffers are handed out round-robin per name; a ring needs
+    more slots than buffers of that name in use at the same time.
+    """
+    
+    def __init__(self):
+        self._rings: Dict[str, List[np.ndarray]] = {}
+        self._next_slot: Dict[str, int] = {}
+        self.allocations = 0
+    
+    def get(self, name: str, shape: Tuple[int, ...], slots: int = 1, dtype=np.uint8) -> np.ndarray:
+        """
+        Return the next buffer of a named ring, viewed as shape.
+        
+        Args:
+            name: Ring name
+            shape: Array shape needed (may vary between calls; smaller shapes reuse a larger buffer)
+            slots: Number of buffers in the ring
+            dtype: Array data type
+            
+        Returns:
+            Contiguous array with undefined contents
+        """
+        ring = self._rings.setdefault(name, [])
+        slot = self._next_slot.get(name, 0) % slots
+        self._next_slot[name] = slot + 1
+        
+        size = int(np.prod(shape))
+        if slot == len(ring):
+            ring.append(None)
+        buffer = ring[slot]
+        if buffer is None or buffer.size < size or buffer.dtype != dtype:
+            buffer = ring[slot] = np.empty(size, dtype=dtype)
+            self.allocations += 1
+        return buffer[:size].reshape(shape)
+
+
+class FFmpegVideoReader:
+    """
+    Video decoder running ffmpeg as a subprocess that streams raw BGR frames over a pipe.
+    
+    Mirrors the parts of cv2.VideoCapture the video loops use (read, get, isOpened, release).
+    With a frame interval, ffmpeg selects every Nth frame itself so skipped frames are
+    never converted to BGR or sent over the pipe.
+    """
+    
+    def __init__(self, video_path: Path, width: int, height: int, fps: float, frame_count: int, frame_interval: int = 1):
+        """
+        Start decoding a video.
+        
+        Args:
+            video_path: Path to input video
+            width: Frame width after rotation (as reported by cv2.VideoCapture)
+            height: Frame height after rotation
+            fps: Frames per second of the video
+            frame_count: Number of frames in the video
+            frame_interval: Only return frames 1, 1+N, 1+2N, ... of the video
+        """
+        self._properties = {
+            cv2.CAP_PROP_FRAME_WIDTH: float(width),
+            cv2.CAP_PROP_FRAME_HEIGHT: float(height),
+            cv2.CAP_PROP_FPS: float(fps),
+            cv2.CAP_PROP_FRAME_COUNT: float(frame_count),
+        }
+        self._shape = (height, width, 3)
+        self._frame_size = height * width * 3
+        self.frame_interval = max(1, frame_interval)
+        self.frame_number = 0  # Source frame number of the last frame read (1-indexed)
+        self._ended = False
+        
+        select_args = []
+        if self.frame_interval > 1:
+            # Drop skipped frames before pixel format conversion
+            select_args = ['-vf', f'select=not(mod(n\\,{self.frame_interval}))']
+        
+        # Temporary file instead of a pipe, so a chatty ffmpeg can never block on stderr
+        self._stderr = tempfile.TemporaryFile()
+        self._process = subprocess.Popen([
+            'ffmpeg', '-v', 'error', '-nostdin',
+            '-i', str(video_path),
+            '-map', '0:v:0',
+            *select_args,
+            # Passthrough: every decoded frame exactly once, instead of duplicating or dropping variable frame rate frames
+            '-vsync', '0',
+            '-f', 'rawvideo', '-pix_fmt', 'bgr24',
+            '-'
+        ], stdout=subprocess.PIPE, stderr=self._stderr, bufsize=self._frame_size)
+    
+    def isOpened(self) -> bool:
+        return self._process is not None and (self._process.poll() is None or self._process.returncode == 0)
+    
+    def get(self, prop_id: int) -> float:
+        return self._properties.get(prop_id, 0.0)
+    
+    def read(self, image: Optional[np.ndarray] = None) -> Tuple[bool, Optional[np.ndarray]]:
+        """
+        Read the next frame, into image if it is a contiguous uint8 array of the frame shape.
+        
+        Returns:
+            (True, frame) or (False, None) at the end of the video
+            
+        Raises:
+            RuntimeError: If ffmpeg failed to decode the video
+        """
+        if image is None or image.shape != self._shape or image.dtype != np.uint8 or not image.flags.c_contiguous:
+            image = np.empty(self._shape, dtype=np.uint8)
+        view = memoryview(image).cast('B')
+        filled = 0
+        while filled < self._frame_size:
+            count = self._process.stdout.readinto(view[filled:])
+            if not count:
+                if not self._ended and self._process.wait() != 0:
+                    self._ended = True
+                    self._stderr.seek(0)
+                    message = self._stderr.read().decode(errors='replace').strip()
+                    raise RuntimeError(f"ffmpeg could not decode the video: {message or f'exit code {self._process.returncode}'}")
+                if not self._ended and self.frame_number > 0:
+                    # ffmpeg does not report the skipped frames after the last selected one, the container frame count bounds them
+                    trailing = int(self._properties[cv2.CAP_PROP_FRAME_COUNT]) - self.frame_number
+                    self.frame_number += min(max(0, trailing), self.frame_interval - 1)
+                self._ended = True
+                return False, None
+            filled += count
+        self.frame_number += 1 if self.frame_number == 0 else self.frame_interval
+        return True, image
+    
+    def release(self):
+        if self._process is None:
+            return
+        self._process.stdout.close()
+        if self._process.poll() is None:
+            self._process.kill()
+        self._process.wait()
+        self._process = None
+        self._stderr.close()
+
+
+class FFmpegVideoWriter:
+    """
+    Video encoder running ffmpeg as a subprocess that reads raw BGR frames from a pipe,
+    optionally stream-copying the audio of a source file in the same pass.
+    
+    Mirrors the parts of cv2.VideoWriter the video loops use (write, isOpened, release).
+    Frames are encoded at a constant frame rate as yuv420p, which needs even frame dimensions:
+    the last column/row of odd-sized frames is cropped, like cv2.VideoWriter does.
+    """
+    
+    def __init__(self, output_path: Path, width: int, height: int, fps: float, codec: str = 'libx264', preset: Optional[str] = 'veryfast', crf: Optional[int] = 23, audio_source: Optional[Path] = None):
+        """
+        Start encoding a video.
+        
+        Args:
+            output_path: Path for output video
+            width: Frame width
+            height: Frame height
+            fps: Output frames per second
+            codec: ffmpeg video encoder (e.g. libx264, libx265, mpeg4)
+            preset: Encoder speed preset (None = encoder default)
+            crf: Constant rate factor, lower is better quality (None = encoder default)
+            audio_source: Optional file whose first audio track is copied into the output
+        """
+        self._shape = (height, width, 3)
+        # Temporary file instead of a pipe, so a chatty ffmpeg can never block on stderr
+        self._stderr = tempfile.TemporaryFile()
+        self.error: Optional[str] = None
+        
+        command = [
+            'ffmpeg', '-v', 'error', '-y',
+            '-f', 'rawvideo', '-pix_fmt', 'bgr24', '-s', f'{width}x{height}', '-r', f'{fps}',
+            '-i', '-',
+        ]
+        if audio_source is not None:
+            command += ['-i', str(audio_source), '-map', '0:v:0', '-map', '1:a:0?', '-c:a', 'copy']
+        command += ['-c:v', codec]
+        if preset:
+            command += ['-preset', preset]
+        if crf is not None:
+            command += ['-crf', str(crf)]
+        if width % 2 or height % 2:
+            # 4:2:0 chroma needs even dimensions
+            command += ['-vf', 'crop=trunc(iw/2)*2:trunc(ih/2)*2:0:0']
+        # 4:2:0 plays in browsers and hardware decoders, unlike 4:4:4
+        command += ['-pix_fmt', 'yuv420p', str(output_path)]
+        
+        try:
+            self._process = subprocess.Popen(command, stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=self._stderr)
+        except OSError as e:
+            self._process = None
+            self.error = str(e)
+    
+    def isOpened(self) -> bool:
+        return self._process is not None and self._process.poll() is None
+    
+    def write(self, image: np.ndarray):
+        """Encode one BGR frame of the writer's frame size."""
+        if image.shape != self._shape:
+            raise ValueError(f"Frame shape {image.shape} does not match the video size {self._shape}")
+        try:
+            self._process.stdin.write(memoryview(np.ascontiguousarray(image)).cast('B'))
+        except BrokenPipeError:
+            raise RuntimeError(f"ffmpeg encoder stopped: {self._read_stderr() or 'no error output'}") from None
+    
+    def release(self) -> bool:
+        """
+        Finish encoding and wait for ffmpeg to exit.
+        
+        Returns:
+            True if the video was written successfully (otherwise see self.error)
+        """
+        if self._process is None:
+            return self.error is None
+        try:
+            self._process.stdin.close()
+        except BrokenPipeError:
+            pass
+        if self._process.wait() != 0:
+            self.error = self._read_stderr() or f"ffmpeg exited with code {self._process.returncode}"
+        self._process = None
+        self._stderr.close()
+        return self.error is None
+    
+    def _read_stderr(self) -> str:
+        self._stderr.seek(0)
+        return self._stderr.read().decode(errors='replace').strip()
+
+
+class SkinToneSamples:
+    """
+    Fixed-size ring buffer of YCrCb skin tone samples with running sums, so adding
+    samples and reading their mean/std never touches the samples already kept.
+    """
+    
+    def __init__(self, capacity: int = 100):
+        self.capacity = max(1, capacity)
+        self._samples = np.zeros((self.capacity, 3), dtype=np.int64)  # Unused slots stay zero
+        self._sum = np.zeros(3, dtype=np.int64)
+        self._sum_sq = np.zeros(3, dtype=np.int64)
+        self._next = 0
+        self._count = 0
+    
+    def __len__(self) -> int:
+        return self._count
+    
+    def clear(self):
+        self._samples.fill(0)
+        self._sum.fill(0)
+        self._sum_sq.fill(0)
+        self._next = 0
+        self._count = 0
+    
+    def add(self, samples: np.ndarray):
+        """
+        Append samples, dropping the oldest ones beyond capacity.
+        
+        Args:
+            samples: (N, 3) array of YCrCb pixels, oldest first
+        """
+        samples = samples[-self.capacity:]
+        start = 0
+        while start < len(samples):
+            # Copy in at most two runs: up to the end of the ring, then from its start
+            end = start + min(len(samples) - start, self.capacity - self._next)
+            slots = self._samples[self._next:self._next + end - start]
+            self._sum -= slots.sum(axis=0)
+            self._sum_sq -= (slots * slots).sum(axis=0)
+            slots[:] = samples[start:end]
+            self._sum += slots.sum(axis=0)
+            self._sum_sq += (slots * slots).sum(axis=0)
+            self._next = (self._next + end - start) % self.capacity
+            start = end
+        self._count = min(self.capacity, self._count + len(samples))
+    
+    def mean_std(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Per-channel mean and (population) standard deviation of the kept samples."""
+        count = max(1, self._count)
+        # Integer sums keep the variance exact until the final division
+        variance = (count * self._sum_sq - self._sum * self._sum) / count ** 2
+        return self._sum / count, np.sqrt(np.maximum(variance, 0))
+
+
+class DetectionScheduler:
+    """
+    Decides per video frame whether human detection runs again or the previous detections are
+    propagated, from cheap signals on a small grayscale copy of each frame.
+    
+    'adaptive': a scene cut (large grayscale histogram change) always triggers detection. Otherwise
+    the share of changed pixels inside the current detections (the whole frame while there are none)
+    accumulates from frame to frame and triggers detection once it exceeds motion_budget, so static
+    shots are detected rarely and fast action often. Detections are at least min_interval and at
+    most max_interval frames apart, except after scene cuts.
+    
+    'motion': a motion gate for fixed-camera footage. Each frame is compared with the last detected
+    frame, and detection only runs again once more than motion_threshold of its pixels changed, or
+    max_interval frames after the last detection (at least min_interval frames apart).
+    """
+    
+    CHANGED_PIXEL_THRESHOLD = 20  # Gray level difference for a pixel to count as changed
+    
+    def __init__(self, policy: str = 'adaptive', min_interval: int = 1, max_interval: int = 30, scene_cut_threshold: float = 0.4, motion_budget: float = 0.5, motion_threshold: float = 0.01):
+        """
+        Args:
+            policy: Scheduling policy ('adaptive' or 'motion')
+            min_interval: Minimum number of frames between detections (scene cuts excepted)
+            max_interval: Maximum number of frames between detections
+            scene_cut_threshold: Bhattacharyya distance between consecutive frame histograms that counts as a scene cut
+            motion_budget: Accumulated share of changed pixels (1.0 = the whole region once) that triggers detection
+            motion_threshold: Share of pixels changed since the last detected frame that triggers detection ('motion')
+            
+        Raises:
+            ValueError: If the policy is unknown
+        """
+        check_choice('policy', policy, ('adaptive', 'motion'))
+        self.policy = policy
+        self.min_interval = max(1, min_interval)
+        self.max_interval = max(self.min_interval, max_interval)
+        self.scene_cut_threshold = scene_cut_threshold
+        self.motion_budget = motion_budget
+        self.motion_threshold = motion_threshold
+        self.reset()
+    
+    def reset(self):
+        """Forget previous frames (at the start of a video), so the next frame is detected."""
+        self._previous_frame: Optional[np.ndarray] = None
+        self._previous_histogram: Optional[np.ndarray] = None
+        self._detected_frame: Optional[np.ndarray] = None
+        self._frames_since_detection = 0
+        self._motion = 0.0
+    
+    def should_detect(self, frame: np.ndarray, boxes: List[Tuple[int, int, int, int]]) -> Optional[str]:
+        """
+        Feed the next frame and decide whether it goes through detection.
+        
+        Args:
+            frame: Small grayscale copy of the video frame
+            boxes: Current (propagated) detection boxes (x1, y1, x2, y2) in frame pixels
+            
+        Returns:
+            Why the frame is detected ('first', 'scene_cut', 'motion' or 'max_interval'), or None to propagate
+        """
+        self._frames_since_detection += 1
+        if self.policy == 'motion':
+            reason = self._motion_gate_reason(frame)
+        else:
+            reason = self._adaptive_reason(frame, boxes)
+        
+        if reason is not None:
+            self._detected_frame = frame
+            self._frames_since_detection = 0
+            self._motion = 0.0
+        return reason
+    
+    def _adaptive_reason(self, frame: np.ndarray, boxes: List[Tuple[int, int, int, int]]) -> Optional[str]:
+        """Scene cut, accumulated motion inside the boxes or time since the last detection."""
+        histogram = cv2.calcHist([frame], [0], None, [32], [0, 256])
+        previous = self._previous_frame
+        self._previous_frame = frame
+        self._previous_histogram, previous_histogram = histogram, self._previous_histogram
+        
+        if previous is None or previous.shape != frame.shape:
+            return 'first'
+        if cv2.compareHist(histogram, previous_histogram, cv2.HISTCMP_BHATTACHARYYA) > self.scene_cut_threshold:
+            return 'scene_cut'
+        self._motion += self._changed_share(frame, previous, boxes)
+        if self._frames_since_detection >= self.max_interval:
+            return 'max_interval'
+        if self._frames_since_detection >= self.min_interval and self._motion >= self.motion_budget:
+            return 'motion'
+        return None
+    
+    def _motion_gate_reason(self, frame: np.ndarray) -> Optional[str]:
+        """Change of the whole frame since the last detected frame, or time since the last detection."""
+        reference = self._detected_frame
+        if reference is None or reference.shape != frame.shape:
+            return 'first'
+        if self._frames_since_detection >= self.max_interval:
+            return 'max_interval'
+        if self._frames_since_detection >= self.min_interval and self._changed_share(frame, reference, []) > self.motion_threshold:
+            return 'motion'
+        return None
+    
+    def _changed_share(self, frame: np.ndarray, previous: np.ndarray, boxes: List[Tuple[int, int, int, int]]) -> float:
+        """Share of pixels inside the boxes (or the whole frame without boxes) that changed since the previous frame."""
+        height, width = frame.shape[:2]
+        boxes = [(max(0, x1), max(0, y1), min(width, x2), min(height, y2)) for x1, y1, x2, y2 in boxes]
+        regions = [(slice(y1, y2), slice(x1, x2)) for x1, y1, x2, y2 in boxes if x2 > x1 and y2 > y1] or [(slice(None), slice(None))]
+        changed = total = 0
+        for rows, cols in regions:
+            diff = cv2.absdiff(frame[rows, cols], previous[rows, cols])
+            changed += cv2.countNonZero((diff > self.CHANGED_PIXEL_THRESHOLD).view(np.uint8))
+            total += diff.size
+        return changed / max(1, total)
+
+
+@functools.lru_cache(maxsize=64)
+def structuring_element(shape: int, size: int) -> np.ndarray:
+    """Cached square cv2 structuring element (shape is cv2.MORPH_RECT, MORPH_ELLIPSE or MORPH_CROSS)."""
+    kernel = cv2.getStructuringElement(shape, (size, size))
+    kernel.flags.writeable = False
+    return kernel
+
+
+def dilate_binary(mask: np.ndarray, kernel_size: int, mode: str = 'auto', max_kernel: int = 31) -> np.ndarray:
+    """
+    Dilate a binary uint8 mask with an elliptical kernel (or an approximation of it).
+    
+    Args:
+        mask: Binary uint8 mask, padded by the kernel reach if the dilation must not be clipped
+        kernel_size: Elliptical kernel diameter in pixels
+        mode: 'exact' (elliptical kernel), 'rect' (square kernel, run by OpenCV as separable row and
+              column passes; covers the ellipse) or 'auto' (exact up to max_kernel, larger kernels
+              dilate a downscaled mask)
+        max_kernel: Largest kernel dilated at full resolution in 'auto' mode
+        
+    Returns:
+        Dilated mask of the same shape
+    """
+    if mode == 'rect':
+        return cv2.dilate(mask, structuring_element(cv2.MORPH_RECT, kernel_size))
+    if mode == 'exact' or kernel_size <= max_kernel:
+        return cv2.dilate(mask, structuring_element(cv2.MORPH_ELLIPSE, kernel_size))
+    
+    factor = -(-kernel_size // max_kernel)
+    height, width = mask.shape
+    blocks = np.zeros((-(-height // factor) * factor, -(-width // factor) * factor), dtype=np.uint8)
+    blocks[:height, :width] = mask
+    
+    # Max-pool factor x factor blocks: a rect dilation anchored at the block corner, sampled once per block
+    small = cv2.dilate(blocks, structuring_element(cv2.MORPH_RECT, factor), anchor=(0, 0))[::factor, ::factor]
+    
+    # One extra block of reach absorbs the block rounding, so the result covers the exact dilation
+    small_size = 2 * (-(-(kernel_size // 2) // factor) + 1) + 1
+    small = cv2.dilate(np.ascontiguousarray(small), structuring_element(cv2.MORPH_ELLIPSE, small_size))
+    dilated = cv2.resize(small, (blocks.shape[1], blocks.shape[0]), interpolation=cv2.INTER_NEAREST)[:height, :width]
+    
+    # Trim the block corners back to the exact square reach
+    return cv2.bitwise_and(dilated, cv2.dilate(mask, structuring_element(cv2.MORPH_RECT, kernel_size)))
+
+
+def gaussian_sigma(kernel_size: int) -> float:
+    """Sigma OpenCV uses for a Gaussian kernel of this size when sigma is 0."""
+    return 0.3 * ((kernel_size - 1) * 0.5 - 1) + 0.8
+
+
+def box_blur_sizes(sigma: float, boxes: int = 3) -> List[int]:
+    """
+    Odd box widths whose successive box blurs have the same variance as a Gaussian with this sigma.
+    
+    Args:
+        sigma: Gaussian sigma to approximate
+        boxes: Number of box blurs
+        
+    Returns:
+        List of box widths
+    """
+    ideal = np.sqrt(12 * sigma ** 2 / boxes + 1)
+    lower = int(ideal)
+    if lower % 2 == 0:
+        lower -= 1
+    upper = lower + 2
+    # Number of boxes using the lower width so the total variance matches
+    lower_count = round((12 * sigma ** 2 - boxes * lower ** 2 - 4 * boxes * lower - 3 * boxes) / (-4 * lower - 4))
+    return [lower if i < lower_count else upper for i in range(boxes)]
+
+
+def pyramid_blur(image: np.ndarray, sigma: float, max_sigma: float = 4.0, dst: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Approximate a Gaussian blur with a large sigma by downscaling, blurring
+    with a small kernel and upscaling again.
+    
+    Args:
+        image: Input image
+        sigma: Gaussian sigma to approximate, in full-resolution pixels
+        max_sigma: Largest sigma blurred at the reduced resolution (sets the downscale factor)
+        dst: Optional output array of the image's shape
+        
+    Returns:
+        Blurred image of the same size
+    """
+    factor = int(sigma // max_sigma)
+    if factor < 2:
+        return cv2.GaussianBlur(image, (0, 0), sigma, dst=dst)
+    
+    h, w = image.shape[:2]
+    small = cv2.resize(image, (max(1, round(w / factor)), max(1, round(h / factor))), interpolation=cv2.INTER_AREA)
+    
+    # Area downscaling plus bilinear upscaling already smooth by roughly factor / 2
+    small_sigma = max(0.5, np.sqrt(max(sigma ** 2 - (factor / 2) ** 2, 0.0)) / factor)
+    small = cv2.GaussianBlur(small, (0, 0), small_sigma)
+    
+    return cv2.resize(small, (w, h), dst=dst, interpolation=cv2.INTER_LINEAR)
+
+
+def intense_blur(image: np.ndarray, kernel_size: int, passes: int = 3, engine: str = 'gaussian', dst: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Blur an image as strongly as `passes` Gaussian blurs with a kernel_size kernel.
+    
+    Args:
+        image: Input image region
+        kernel_size: Blur kernel size
+        passes: Number of blur iterations
+        engine: 'gaussian' (one equivalent Gaussian pass), 'box' (three box blurs, cost independent
+                of the kernel size) or 'pyramid' (downscale-blur-upscale approximation)
+        dst: Optional output array of the image's shape (written in place)
+        
+    Returns:
+        Intensely blurred image
+    """
+    if kernel_size <= 1:
+        # A 1x1 kernel leaves the image unchanged, however many passes
+        if dst is None:
+            return image.copy()
+        if dst is not image:
+            np.copyto(dst, image)
+        return dst
+    
+    # Repeated Gaussian blurs add up to one Gaussian with sigma * sqrt(passes)
+    sigma = gaussian_sigma(kernel_size) * np.sqrt(passes)
+    
+    if engine == 'pyramid':
+        return pyramid_blur(image, sigma, dst=dst)
+    
+    if engine == 'box':
+        blurred = image
+        for width in box_blur_sizes(sigma):
+            # After the first pass the box blurs run in place on dst
+            blurred = cv2.blur(blurred, (width, width), dst=dst)
+            dst = blurred
+        return blurred
+    
+    if passes == 1:
+        return cv2.GaussianBlur(image, (kernel_size, kernel_size), 0, dst=dst)
+    
+    # Kernel size follows from sigma (about 3 sigma each side), one pass instead of `passes`
+    return cv2.GaussianBlur(image, (0, 0), sigma, dst=dst)
+
+
+def gaussian_radius(sigma: float) -> int:
+    """Radius of the kernel OpenCV builds for a uint8 Gaussian blur with this sigma and no kernel size."""
+    return (int(round(sigma * 6 + 1)) | 1) // 2
+
+
+def blur_reach(kernel_size: int, passes: int = 3, engine: str = 'gaussian', max_sigma: float = 4.0) -> int:
+    """
+    How far (in pixels) intense_blur reaches: output pixels depend only on input pixels this close.
+    
+    Args:
+        kernel_size: Blur kernel size
+        passes: Number of blur iterations
+        engine: Blur engine as for intense_blur
+        max_sigma: max_sigma of pyramid_blur
+        
+    Returns:
+        Reach in pixels
+    """
+    if kernel_size <= 1:
+        return 0
+    
+    sigma = gaussian_sigma(kernel_size) * np.sqrt(passes)
+    
+    if engine == 'box':
+        return sum(width // 2 for width in box_blur_sizes(sigma))
+    
+    if engine == 'pyramid':
+        factor = int(sigma // max_sigma)
+        if factor >= 2:
+            # Small Gaussian plus one block for the area downscale and one for the bilinear upscale
+            small_sigma = max(0.5, np.sqrt(max(sigma ** 2 - (factor / 2) ** 2, 0.0)) / factor)
+            return (gaussian_radius(small_sigma) + 2) * factor
+    elif passes == 1:
+        return kernel_size // 2
+    
+    return gaussian_radius(sigma)
+
+
+def benchmark_blur_engines(image: np.ndarray, kernel_size: int, passes: int, repeats: int = 3) -> Dict[str, Dict[str, float]]:
+    """
+    Time every blur engine on an image and compare its output with the
+    reference multi-pass Gaussian blur.
+    
+    Args:
+        image: Test image
+        kernel_size: Blur kernel size
+        passes: Number of blur passes
+        repeats: Timed runs per engine (the best run is reported)
+        
+    Returns:
+        Per-engine dict with 'ms' (best time) and 'psnr' (dB vs. the reference, inf if identical)
+    """
+    reference = image.copy()
+    for _ in range(passes):
+        reference = cv2.GaussianBlur(reference, (kernel_size, kernel_size), 0)
+    
+    report = {}
+    for engine in BLUR_ENGINES:
+        best = float('inf')
+        for _ in range(repeats):
+            start = time.time()
+            blurred = intense_blur(image, kernel_size, passes, engine)
+            best = min(best, time.time() - start)
+        report[engine] = {
+            'ms': round(best * 1000, 2),
+            'psnr': round(cv2.PSNR(reference, blurred), 2) if not np.array_equal(reference, blurred) else float('inf'),
+        }
+    return report
+
+
+def crop_letterbox_padding(masks: np.ndarray, image_shape: Tuple[int, ...]) -> np.ndarray:
+    """
+    Remove the letterbox border from masks computed at model input resolution.
+    
+    Args:
+        masks: Masks at model input resolution, shape (N, H_in, W_in)
+        image_shape: Shape of the original image
+        
+    Returns:
+        Masks covering exactly the original image area, shape (N, h, w)
+    """
+    input_h, input_w = masks.shape[1:3]
+    gain = min(input_h / image_shape[0], input_w / image_shape[1])
+    pad_w = (input_w - image_shape[1] * gain) / 2
+    pad_h = (input_h - image_shape[0] * gain) / 2
+    top, left = int(pad_h), int(pad_w)
+    bottom, right = int(input_h - pad_h), int(input_w - pad_w)
+    return masks[:, top:bottom, left:right]
+
+
+class TorchInferenceEngine:
+    """
+    Runs an ultralytics YOLO model (.pt) with PyTorch.
+    """
+    
+    def __init__(self, model_name: str, num_threads: int = 0):
+        """
+        Args:
+            model_name: YOLO model name or path
+            num_threads: CPU threads for torch (0 = library default)
+        """
+        # Imported lazily so ONNX deployments never pay for torch
+        from ultralytics import YOLO
+        
+        if num_threads > 0:
+            import torch
+            torch.set_num_threads(num_threads)
+        
+        self.model = YOLO(model_name)
+        self.names = self.model.names
+    
+    def predict(self, images: List[np.ndarray], confidence: float, classes: Optional[List[int]] = None) -> List[ModelPrediction]:
+        """
+        Run the model on a list of BGR images.
+        
+        Args:
+            images: Input images
+            confidence: Confidence threshold
+            classes: Only return these class ids (filtered before NMS and mask decoding), None for all classes
+            
+        Returns:
+            One ModelPrediction per image
+        """
+        results = self.model(images, conf=confidence, classes=classes, verbose=False)
+        
+        predictions = []
+        for result, image in zip(results, images):
+            boxes = result.boxes
+            masks = None
+            if getattr(result, 'masks', None) is not None:
+                masks = crop_letterbox_padding(result.masks.data.cpu().numpy(), image.shape)
+            predictions.append(ModelPrediction(
+                boxes.xyxy.cpu().numpy(),
+                boxes.conf.cpu().numpy(),
+                boxes.cls.cpu().numpy().astype(int),
+                masks,
+            ))
+        return predictions
+
+
+class ExportedModelEngine:
+    """
+    Shared letterbox preprocessing and YOLOv8 output decoding (boxes, NMS and
+    mask prototypes) for models exported from ultralytics. Subclasses run the network.
+    """
+    
+    iou_threshold = 0.7  # NMS IoU threshold (ultralytics default)
+    max_detections = 300
+    
+    def __init__(self, metadata: Dict[str, str], input_shape: List[Any]):
+        """
+        Args:
+            metadata: Ultralytics export metadata (names, stride, imgsz)
+            input_shape: Network input shape (batch, 3, height, width), non-integer dims are dynamic
+        """
+        self.names = ast.literal_eval(metadata['names']) if 'names' in metadata else {}
+        self.stride = int(metadata.get('stride', 32))
+        self.imgsz = tuple(ast.literal_eval(metadata.get('imgsz', '[640, 640]')))
+        self.dynamic = not all(isinstance(dim, int) for dim in input_shape[2:])
+        self.max_batch = input_shape[0] if isinstance(input_shape[0], int) else None
+        if not self.dynamic:
+            self.imgsz = (input_shape[2], input_shape[3])
+    
+    def _run(self, blob: np.ndarray) -> List[np.ndarray]:
+        """Run the network on a (B, 3, H, W) float32 blob and return its outputs."""
+        raise NotImplementedError
+    
+    def _letterbox(self, image: np.ndarray, auto: bool) -> Tuple[np.ndarray, float, Tuple[float, float]]:
+        """Resize and pad an image like ultralytics' LetterBox. Returns (image, gain, (pad_w, pad_h))."""
+        new_h, new_w = self.imgsz
+        h, w = image.shape[:2]
+        gain = min(new_h / h, new_w / w)
+        unpad_w, unpad_h = int(round(w * gain)), int(round(h * gain))
+        pad_w, pad_h = new_w - unpad_w, new_h - unpad_h
+        if auto:
+            # Minimal rectangle: pad only up to the next stride multiple
+            pad_w, pad_h = pad_w % self.stride, pad_h % self.stride
+        pad_w, pad_h = pad_w / 2, pad_h / 2
+        
+        if (w, h) != (unpad_w, unpad_h):
+            image = cv2.resize(image, (unpad_w, unpad_h), interpolation=cv2.INTER_LINEAR)
+        top, bottom = int(round(pad_h - 0.1)), int(round(pad_h + 0.1))
+        left, right = int(round(pad_w - 0.1)), int(round(pad_w + 0.1))
+        image = cv2.copyMakeBorder(image, top, bottom, left, right, cv2.BORDER_CONSTANT, value=(114, 114, 114))
+        return image, gain, (pad_w, pad_h)
+    
+    def preprocess(self, images: List[np.ndarray], auto: bool = False) -> Tuple[np.ndarray, List[Tuple[float, Tuple[float, float]]]]:
+        """
+        Letterbox BGR images into the network input blob.
+        
+        Args:
+            images: Input images
+            auto: Pad only up to the next stride multiple instead of the full input size (dynamic models)
+            
+        Returns:
+            (B, 3, H, W) RGB float32 blob in [0, 1] and each image's (gain, (pad_w, pad_h))
+        """
+        letterboxed = [self._letterbox(image, auto) for image in images]
+        # BGR HWC uint8 -> RGB CHW float32 in [0, 1]
+        blob = np.stack([lb_image[..., ::-1].transpose(2, 0, 1) for lb_image, _, _ in letterboxed])
+        blob = np.ascontiguousarray(blob, dtype=np.float32) / 255.0
+        return blob, [(gain, pad) for _, gain, pad in letterboxed]
+    
+    def predict(self, images: List[np.ndarray], confidence: float, classes: Optional[List[int]] = None) -> List[ModelPrediction]:
+        """
+        Run the model on a list of BGR images.
+        
+        Args:
+            images: Input images
+            confidence: Confidence threshold
+            classes: Only return these class ids (filtered before NMS and mask decoding), None for all classes
+            
+        Returns:
+            One ModelPrediction per image
+        """
+        # Same-shaped batches use the minimal stride-aligned rectangle, mixed shapes the full square
+        auto = self.dynamic and len({image.shape for image in images}) == 1
+        chunk_size = self.max_batch or len(images)
+        
+        predictions = []
+        for start in range(0, len(images), chunk_size):
+            chunk = images[start:start + chunk_size]
+            blob, letterbox_params = self.preprocess(chunk, auto)
+            
+            outputs = self._run(blob)
+            protos = outputs[1] if len(outputs) > 1 else None
+            
+            for idx, (image, (gain, pad)) in enumerate(zip(chunk, letterbox_params)):
+                predictions.append(self._decode(
+                    outputs[0][idx],
+                    protos[idx] if protos is not None else None,
+                    image.shape, blob.shape[2:], gain, pad, confidence, classes,
+                ))
+        return predictions
+    
+    def _decode(self, output: np.ndarray, protos: Optional[np.ndarray], image_shape: Tuple[int, ...], input_shape: Tuple[int, int], gain: float, pad: Tuple[float, float], confidence: float, classes: Optional[List[int]] = None) -> ModelPrediction:
+        """Decode one image's raw output (4 + classes + mask coefficients, anchors) into a ModelPrediction."""
+        num_classes = len(self.names)
+        predictions = output.T  # (anchors, 4 + num_classes + num_mask_coefficients)
+        class_scores = predictions[:, 4:4 + num_classes]
+        
+        class_ids = class_scores.argmax(axis=1)
+        scores = class_scores[np.arange(len(class_ids)), class_ids]
+        keep = scores > confidence
+        if classes is not None:
+            keep &= np.isin(class_ids, classes)
+        predictions, class_ids, scores = predictions[keep], class_ids[keep], scores[keep]
+        
+        if len(predictions) == 0:
+            input_h, input_w = input_shape
+            empty_masks = np.zeros((0, input_h, input_w), dtype=np.uint8) if protos is not None else None
+            return ModelPrediction(np.zeros((0, 4), dtype=np.float32), np.zeros(0, dtype=np.float32), np.zeros(0, dtype=int),
+                                   crop_letterbox_padding(empty_masks, image_shape) if empty_masks is not None else None)
+        
+        # Class-aware NMS on (x, y, w, h) boxes in input pixels
+        xywh = predictions[:, :4]
+        nms_boxes = np.column_stack([xywh[:, 0] - xywh[:, 2] / 2, xywh[:, 1] - xywh[:, 3] / 2, xywh[:, 2], xywh[:, 3]])
+        kept = cv2.dnn.NMSBoxesBatched(nms_boxes.tolist(), scores.tolist(), class_ids.tolist(), confidence, self.iou_threshold)
+        kept = np.array(kept, dtype=int).reshape(-1)
+        kept = kept[np.argsort(-scores[kept])][:self.max_detections]
+        predictions, class_ids, scores = predictions[kept], class_ids[kept], scores[kept]
+        
+        boxes_input = np.column_stack([
+            predictions[:, 0] - predictions[:, 2] / 2, predictions[:, 1] - predictions[:, 3] / 2,
+            predictions[:, 0] + predictions[:, 2] / 2, predictions[:, 1] + predictions[:, 3] / 2,
+        ]).reshape(-1, 4)
+        
+        masks = None
+        if protos is not None:
+            masks = self._decode_masks(protos, predictions[:, 4 + num_classes:], boxes_input, input_shape)
+            masks = crop_letterbox_padding(masks, image_shape)
+        
+        # Map boxes from letterboxed input back to image pixels
+        boxes = boxes_input.copy()
+        boxes[:, [0, 2]] -= round(pad[0] - 0.1)
+        boxes[:, [1, 3]] -= round(pad[1] - 0.1)
+        boxes /= gain
+        boxes[:, [0, 2]] = boxes[:, [0, 2]].clip(0, image_shape[1])
+        boxes[:, [1, 3]] = boxes[:, [1, 3]].clip(0, image_shape[0])
+        
+        return ModelPrediction(boxes.astype(np.float32), scores.astype(np.float32), class_ids.astype(int), masks)
+    
+    def _decode_masks(self, protos: np.ndarray, coefficients: np.ndarray, boxes: np.ndarray, input_shape: Tuple[int, int]) -> np.ndarray:
+        """
+        Build binary instance masks at input resolution from mask prototypes, like
+        ultralytics' process_mask: upsample the logits, threshold at 0 and crop to each box.
+        """
+        num_protos, proto_h, proto_w = protos.shape
+        input_h, input_w = input_shape
+        if len(coefficients) == 0:
+            return np.zeros((0, input_h, input_w), dtype=np.uint8)
+        
+        logits = (coefficients @ protos.reshape(num_protos, -1)).reshape(-1, proto_h, proto_w)
+        
+        masks = np.empty((len(logits), input_h, input_w), dtype=np.uint8)
+        for idx, logit in enumerate(logits):
+            upsampled = cv2.resize(logit, (input_w, input_h), interpolation=cv2.INTER_LINEAR)
+            masks[idx] = upsampled > 0
+        
+        # Zero everything outside each (input resolution) box
+        columns = np.arange(input_w)[None, None, :]
+        rows = np.arange(input_h)[None, :, None]
+        x1, y1, x2, y2 = (boxes[:, i][:, None, None] for i in range(4))
+        masks *= ((columns >= x1) & (columns < x2)).astype(np.uint8)
+        masks *= ((rows >= y1) & (rows < y2)).astype(np.uint8)
+        return masks
+
+
+class OnnxInferenceEngine(ExportedModelEngine):
+    """
+    Runs an ultralytics YOLO model exported to ONNX with ONNX Runtime on the CPU.
+    """
+    
+    def __init__(self, model_name: str, num_threads: int = 0):
+        """
+        Args:
+            model_name: Path to an .onnx file, or a .pt model to export to ONNX on first use
+            num_threads: CPU threads for ONNX Runtime (0 = library default)
+        """
+        if not ONNX_SUPPORT:
+            raise ImportError("ONNX Runtime not installed. Install with: pip install onnxruntime")
+        
+        model_path = export_model(model_name, 'onnx')
+        
+        options = onnxruntime.SessionOptions()
+        if num_threads > 0:
+            options.intra_op_num_threads = num_threads
+        self.session = onnxruntime.InferenceSession(str(model_path), options, providers=['CPUExecutionProvider'])
+        
+        model_input = self.session.get_inputs()[0]
+        self.input_name = model_input.name
+        super().__init__(self.session.get_modelmeta().custom_metadata_map, model_input.shape)
+    
+    def _run(self, blob: np.ndarray) -> List[np.ndarray]:
+        return self.session.run(None, {self.input_name: blob})
+
+
+class OpenVinoInferenceEngine(ExportedModelEngine):
+    """
+    Runs an ultralytics YOLO model exported to OpenVINO IR on the CPU. Compiled
+    models are cached on disk, so later starts skip compilation.
+    """
+    
+    def __init__(self, model_name: str, num_threads: int = 0, cache_dir: Optional[str] = None):
+        """
+        Args:
+            model_name: Path to an OpenVINO model directory, or a .pt model to export on first use
+            num_threads: CPU threads for OpenVINO (0 = library default)
+            cache_dir: Compiled model cache directory (default: 'cache' inside the model directory)
+        """
+        if not OPENVINO_SUPPORT:
+            raise ImportError("OpenVINO not installed. Install with: pip install openvino")
+        
+        import yaml
+        
+        model_dir = export_model(model_name, 'openvino')
+        model_xml = next(model_dir.glob('*.xml'))
+        with open(model_dir / 'metadata.yaml') as f:
+            metadata = {key: str(value) for key, value in yaml.safe_load(f).items()}
+        
+        core = openvino.Core()
+        core.set_property({'CACHE_DIR': str(cache_dir or model_dir / 'cache')})
+        
+        model = core.read_model(str(model_xml))
+        config = {'INFERENCE_NUM_THREADS': num_threads} if num_threads > 0 else {}
+        self.compiled_model = core.compile_model(model, 'CPU', config)
+        
+        input_shape = [dim.get_length() if dim.is_static else '?' for dim in model.inputs[0].get_partial_shape()]
+        super().__init__(metadata, input_shape)
+    
+    def _run(self, blob: np.ndarray) -> List[np.ndarray]:
+        results = self.compiled_model(blob)
+        return [results[output] for output in self.compiled_model.outputs]
+
+
+def export_model(model_name: str, export_format: str) -> Path:
+    """
+    Return the exported model for a YOLO model, exporting it with ultralytics on first use.
+    
+    Args:
+        model_name: Path to an exported model, or a .pt model name/path
+        export_format: Ultralytics export format ('onnx' or 'openvino')
+        
+    Returns:
+        Path to the exported model file (ONNX) or directory (OpenVINO)
+    """
+    model_path = Path(model_name)
+    if export_format == 'onnx' and model_path.suffix == '.onnx':
+        return model_path
+    if export_format == 'openvino' and model_path.is_dir():
+        return model_path
+    
+    if export_format == 'openvino':
+        exported_path = model_path.with_name(f"{model_path.stem}_openvino_model")
+    else:
+        exported_path = model_path.with_suffix('.onnx')
+    if exported_path.exists():
+        return exported_path
+    
+    print(f"Exporting {model_name} to {export_format.upper()} (one-time)...")
+    from ultralytics import YOLO
+    # Dynamic axes allow batched inference and stride-aligned rectangular inputs
+    return Path(YOLO(model_name).export(format=export_format, dynamic=True))
+
+
+def quantized_model_path(model_name: str, engine: str) -> Path:
+    """
+    Return where the INT8 model built by calibration is stored for a model and engine.
+    
+    Args:
+        model_name: YOLO model name or path (.pt, an exported .onnx file or an OpenVINO model directory)
+        engine: Inference engine ('onnx' or 'openvino')
+        
+    Returns:
+        Path to the INT8 .onnx file or OpenVINO model directory
+    """
+    model_path = Path(model_name)
+    stem = model_path.stem.replace('_openvino_model', '')
+    if engine == 'openvino':
+        return model_path.with_name(f"{stem}-int8_openvino_model")
+    return model_path.with_name(f"{stem}-int8.onnx")
+
+
+def quantize_model(model_name: str, engine: str, calibration_blobs: List[np.ndarray]) -> Path:
+    """
+    Build an INT8 model with post-training static quantization.
+    
+    Convolutions and matrix multiplications are quantized; the box and mask
+    decoding at the end of the network stays in floating point.
+    
+    Args:
+        model_name: YOLO model name or path, exported to ONNX/OpenVINO first if needed
+        engine: Inference engine ('onnx' uses ONNX Runtime quantization, 'openvino' uses NNCF)
+        calibration_blobs: Preprocessed (3, H, W) float32 network inputs from representative images
+        
+    Returns:
+        Path to the INT8 model (see quantized_model_path)
+    """
+    output_path = quantized_model_path(model_name, engine)
+    
+    if engine == 'openvino':
+        try:
+            import nncf
+        except ImportError:
+            raise ImportError("NNCF not installed. Install with: pip install nncf")
+        import shutil
+        
+        model_dir = export_model(model_name, 'openvino')
+        model_xml = next(model_dir.glob('*.xml'))
+        model = openvino.Core().read_model(str(model_xml))
+        
+        dataset = nncf.Dataset(calibration_blobs, lambda blob: blob[None])
+        quantized = nncf.quantize(model, dataset, subset_size=len(calibration_blobs),
+                                  ignored_scope=nncf.IgnoredScope(types=['Multiply', 'Subtract', 'Sigmoid']))
+        
+        output_path.mkdir(parents=True, exist_ok=True)
+        openvino.save_model(quantized, str(output_path / model_xml.name))
+        shutil.copy(model_dir / 'metadata.yaml', output_path / 'metadata.yaml')
+        return output_path
+    
+    if not ONNX_SUPPORT:
+        raise ImportError("ONNX Runtime not installed. Install with: pip install onnxruntime")
+    import onnx
+    from onnxruntime.quantization import CalibrationDataReader, QuantFormat, QuantType, quantize_static
+    
+    model_path = export_model(model_name, 'onnx')
+    input_name = onnxruntime.InferenceSession(str(model_path), providers=['CPUExecutionProvider']).get_inputs()[0].name
+    
+    class BlobReader(CalibrationDataReader):
+        def __init__(self):
+            self.blobs = iter(calibration_blobs)
+        
+        def get_next(self):
+            blob = next(self.blobs, None)
+            return None if blob is None else {input_name: blob[None]}
+    
+    quantize_static(str(model_path), str(output_path), BlobReader(), quant_format=QuantFormat.QDQ,
+                    op_types_to_quantize=['Conv', 'MatMul'], per_channel=True,
+                    activation_type=QuantType.QUInt8, weight_type=QuantType.QInt8)
+    
+    # Keep the ultralytics metadata (class names, stride, image size) the engine needs
+    source, quantized = onnx.load(str(model_path)), onnx.load(str(output_path))
+    del quantized.metadata_props[:]
+    quantized.metadata_props.extend(source.metadata_props)
+    onnx.save(quantized, str(output_path))
+    return output_path
+
+
+def load_inference_engine(model_name: str, engine: str = 'torch', num_threads: int = 0, precision: str = 'fp32'):
+    """
+    Load a YOLO model with the requested inference engine.
+    
+    Args:
+        model_name: YOLO model name or path (.pt, an exported .onnx file or an OpenVINO model directory)
+        engine: Inference engine ('torch', 'onnx' or 'openvino'); exported models always use their own runtime
+        num_threads: CPU threads for inference (0 = library default)
+        precision: 'fp32', or 'int8' to load the quantized model built by calibration (onnx/openvino only)
+        
+    Returns:
+        Inference engine with a predict(images, confidence, classes=None) method and a names mapping
+    """
+    if precision == 'int8':
+        if engine not in ('onnx', 'openvino'):
+            raise ValueError("INT8 precision requires the onnx or openvino engine")
+        model_name = str(quantized_model_path(model_name, engine))
+        if not Path(model_name).exists():
+            raise FileNotFoundError(f"INT8 model not found: {model_name} (build it with --calibrate <sample images folder>)")
+    
+    if engine == 'openvino' or Path(model_name).is_dir():
+        return OpenVinoInferenceEngine(model_name, num_threads)
+    if engine == 'onnx' or model_name.endswith('.onnx'):
+        return OnnxInferenceEngine(model_name, num_threads)
+    return TorchInferenceEngine(model_name, num_threads)
+
 
 class HumanBlurProcessor:
     """
@@ -37,7 +1213,10 @@ class HumanBlurProcessor:
     SUPPORTED_VIDEO_FORMATS = {'.mp4', '.mov'}
     SUPPORTED_FORMATS = SUPPORTED_IMAGE_FORMATS | SUPPORTED_VIDEO_FORMATS
     
-    def __init__(self, model_name: str = 'yolov8n-seg.pt', blur_intensity: int = 151, blur_passes: int = 3, mask_type: str = 'black', enable_object_detection: bool = False, detection_model: str = 'yolov8m.pt', filename_suffix: str = '-background', keep_audio: bool = True, frame_interval: int = 1, enable_skin_detection: bool = False, progress_callback=None):
+    SKIN_MORPHOLOGY_MARGIN = 6  # Reach of the skin mask clean-up morphology in pixels
+    MASK_FLOW_SIZE = 320  # Longest side of the grayscale frames mask propagation computes optical flow on
+    
+    def __init__(self, model_name: str = 'yolov8n-seg.pt', blur_intensity: int = 151, blur_passes: int = 3, mask_type: str = 'black', enable_object_detection: bool = False, detection_model: str = 'yolov8m.pt', filename_suffix: str = '-background', keep_audio: bool = True, frame_interval: int = 1, enable_skin_detection: bool = False, progress_callback=None, batch_size: int = 1, threaded_pipeline: bool = False, pipeline_queue_size: int = 8, workers: int = 1, video_segments: int = 1, model_loader: Optional[Callable[[str, str, str], Any]] = None, inference_engine: str = 'torch', inference_threads: int = 0, precision: str = 'fp32', blur_engine: str = 'gaussian', morphology: str = 'auto', max_skin_samples: int = 100, video_io: str = 'ffmpeg', video_codec: str = 'libx264', video_preset: Optional[str] = 'veryfast', video_crf: Optional[int] = 23, detection_interval: int = 1, mask_propagation: Optional[str] = None, detection_scheduler: str = 'fixed', min_detection_interval: int = 1, max_detection_interval: int = 30, motion_threshold: float = 0.01):
         """
         Initialize the human blur processor with segmentation support.
         
@@ -53,9 +1232,60 @@ class HumanBlurProcessor:
             frame_interval: Process every Nth frame (1 = every frame, 3 = every 3rd frame, etc.)
             enable_skin_detection: Enable skin tone detection with temporal tracking (default: False)
             progress_callback: Optional callback function for progress updates (receives current, total)
+            batch_size: Number of video frames (or directory images) sent to the segmentation model per inference call (default: 1);
+                        with workers > 1 each worker processes images one at a time, videos still use batch_size
+            threaded_pipeline: Run video decode, inference, masking and encode on separate threads (default: False)
+            pipeline_queue_size: Maximum number of frames buffered between pipeline stages (default: 8)
+            workers: Number of worker processes for directory processing, each with its own model (default: 1)
+            video_segments: Split each video at keyframes into this many parts processed in parallel processes (default: 1)
+            model_loader: Optional callable returning a loaded inference engine for (model_name, inference_engine, precision)
+                          (default: load_inference_engine), e.g. a cache shared between processors
+            inference_engine: Inference backend, 'torch' (ultralytics/PyTorch), 'onnx' (ONNX Runtime, CPU) or 'openvino' (OpenVINO, CPU)
+            inference_threads: CPU threads used by the inference engine (0 = library default)
+            precision: Segmentation model precision, 'fp32' or 'int8' (quantized model built by calibrate_int8, onnx/openvino only)
+            blur_engine: Blur implementation, 'gaussian' (one equivalent Gaussian pass), 'box' (three box blurs) or 'pyramid' (downscale-blur-upscale)
+            morphology: Mask dilation, 'auto' (large kernels dilate a downscaled mask), 'exact' (full-resolution elliptical kernel)
+                        or 'rect' (square kernel, fastest)
+            max_skin_samples: Number of most recent skin tone samples the adaptive skin range is computed from (default: 100)
+            video_io: Video decoding/encoding backend, 'ffmpeg' (subprocess pipes, audio copied while encoding) or 'opencv'
+                      (cv2.VideoCapture/VideoWriter with mp4v); falls back to 'opencv' when ffmpeg is not installed
+            video_codec: ffmpeg video encoder for output videos (default: libx264)
+            video_preset: Encoder speed preset, e.g. ultrafast..veryslow for libx264 (None = encoder default)
+            video_crf: Constant rate factor, lower is better quality and larger files (None = encoder default)
+            detection_interval: Detect humans on every Nth processed video frame and propagate the masks to the frames
+                                in between, which are still written (1 = detect on every frame; 'fixed' scheduler)
+            mask_propagation: How masks reach the frames between detections, 'flow' (warped by dense optical flow)
+                              or 'hold' (reused unchanged); default 'hold' for the 'motion' scheduler, whose skipped
+                              frames barely changed, and 'flow' otherwise
+            detection_scheduler: Which video frames are detected, 'fixed' (every detection_interval-th frame), 'adaptive'
+                                 (on scene cuts and motion inside the masks) or 'motion' (when the frame changed since the
+                                 last detection, for fixed cameras); see DetectionScheduler, one frame per model call
+            min_detection_interval: Minimum number of frames between detections for the 'adaptive' and 'motion' schedulers
+            max_detection_interval: Maximum number of frames between detections (forced refresh) for the 'adaptive' and 'motion' schedulers
+            motion_threshold: Share of pixels that must change since the last detected frame to detect again ('motion' scheduler)
         """
+        # Constructor arguments used to build identical processors in worker processes (taken before any is reassigned)
+        arguments = locals()
+        self.processor_settings = {
+            name: arguments[name] for name in inspect.signature(HumanBlurProcessor.__init__).parameters
+            if name not in ('self', 'progress_callback', 'workers', 'model_loader')
+        }
+        
+        check_choice('blur_engine', blur_engine, BLUR_ENGINES)
+        check_choice('morphology', morphology, MORPHOLOGY_MODES)
+        check_choice('video_io', video_io, VIDEO_IO_BACKENDS)
+        check_choice('detection_scheduler', detection_scheduler, DETECTION_SCHEDULERS)
+        if mask_propagation is not None:
+            check_choice('mask_propagation', mask_propagation, MASK_PROPAGATION_MODES)
+        
         self.blur_intensity = blur_intensity if blur_intensity % 2 == 1 else blur_intensity + 1
         self.blur_passes = max(1, blur_passes)
+        self.blur_engine = blur_engine  # 'gaussian', 'box' or 'pyramid'
+        self.morphology = morphology  # 'auto', 'exact' or 'rect'
+        self.video_io = video_io  # 'ffmpeg' or 'opencv'
+        self.video_codec = video_codec  # ffmpeg encoder name
+        self.video_preset = video_preset  # Encoder speed preset
+        self.video_crf = video_crf  # Encoder quality (constant rate factor)
         self.mask_type = mask_type
         self.use_segmentation = '-seg' in model_name
         self.enable_object_detection = enable_object_detection
@@ -63,18 +1293,35 @@ class HumanBlurProcessor:
         self.filename_suffix = filename_suffix  # Store custom filename suffix
         self.keep_audio = keep_audio  # Store audio handling preference
         self.frame_interval = max(1, frame_interval)  # Store frame interval (minimum 1)
+        self.detection_interval = max(1, detection_interval)  # Detect humans on every Nth processed video frame
+        self.mask_propagation = mask_propagation or ('hold' if detection_scheduler == 'motion' else 'flow')  # 'flow' or 'hold'
+        self._propagation: Optional[Dict[str, Any]] = None  # Last detections (and flow frame) while a video is processed
+        self.detection_scheduler = detection_scheduler  # 'fixed', 'adaptive' or 'motion'
+        self._scheduler = None if detection_scheduler == 'fixed' else DetectionScheduler(detection_scheduler, min_detection_interval, max_detection_interval, motion_threshold=motion_threshold)
         self.enable_skin_detection = enable_skin_detection  # Store skin detection preference
         self.progress_callback = progress_callback  # Store progress callback
+        self.batch_size = max(1, batch_size)  # Frames per inference call in video mode (minimum 1)
+        self.threaded_pipeline = threaded_pipeline  # Overlap decode/inference/masking/encode in video mode
+        self.pipeline_queue_size = max(1, pipeline_queue_size)  # Bounded queue size between pipeline stages
+        self._pipeline_queues: Dict[str, queue.Queue] = {}  # Live queues while a threaded video is running
+        self.video_stats: Dict[str, Any] = {}  # Frame counters for the most recently processed video
+        self._buffer_pool: Optional[FrameBufferPool] = None  # Reusable frame buffers while a video is processed
+        self.workers = max(1, workers)  # Worker processes for directory processing (minimum 1)
+        self.video_segments = max(1, video_segments)  # Parallel keyframe-aligned parts per video (minimum 1)
+        self.inference_engine = inference_engine  # 'torch', 'onnx' or 'openvino'
+        self.inference_threads = max(0, inference_threads)  # CPU threads for inference (0 = default)
+        self.model_name = model_name
+        self.precision = precision  # 'fp32' or 'int8'
         
         # Temporal tracking for skin tone detection
-        self.skin_tone_samples = []  # Store YCrCb skin tone samples from previous frames
-        self.max_skin_samples = 100  # Maximum number of skin tone samples to track
+        self.max_skin_samples = max(1, max_skin_samples)  # Maximum number of skin tone samples to track
+        self.skin_tone_samples = SkinToneSamples(self.max_skin_samples)  # YCrCb skin tone samples from previous frames
         
-        print(f"Loading YOLO model: {model_name}...")
+        print(f"Loading YOLO model: {model_name} ({self.inference_engine} engine, {self.precision.upper()})...")
         print(f"Segmentation mode: {'Enabled (Lasso effect)' if self.use_segmentation else 'Disabled (Box blur)'}")
         print(f"Mask type: {self.mask_type.upper()}")
         if self.mask_type == 'blur':
-            print(f"Blur settings: intensity={self.blur_intensity}, passes={self.blur_passes}")
+            print(f"Blur settings: intensity={self.blur_intensity}, passes={self.blur_passes}, engine={self.blur_engine}")
         else:
             print(f"Black mask mode enabled")
         if self.enable_skin_detection:
@@ -82,26 +1329,81 @@ class HumanBlurProcessor:
         if self.frame_interval > 1:
             print(f"Frame skipping enabled: processing every {self.frame_interval} frame(s)")
             print(f"⚠ Audio will be automatically dropped when frame skipping is enabled")
-        
+        if self.detection_scheduler == 'motion':
+            print(f"Motion-gated detection enabled: detections reused until {self._scheduler.motion_threshold:.1%} of the frame changes (refresh every {self._scheduler.max_interval} frames, masks propagated: {self.mask_propagation})")
+        elif self._scheduler is not None:
+            print(f"Adaptive detection scheduling enabled: humans detected every {self._scheduler.min_interval}-{self._scheduler.max_interval} frame(s), masks propagated ({self.mask_propagation}) in between")
+        elif self.detection_interval > 1:
+            print(f"Keyframe detection enabled: humans detected every {self.detection_interval} frame(s), masks propagated ({self.mask_propagation}) in between")
+        if self.batch_size > 1:
+            print(f"Batched inference enabled: {self.batch_size} frames/images per model call")
+        if self.threaded_pipeline:
+            print(f"Threaded video pipeline enabled (queue size: {self.pipeline_queue_size})")
+        if self.workers > 1:
+            print(f"Parallel directory processing enabled: {self.workers} worker processes")
+            if self.batch_size > 1:
+                print(f"ℹ Worker processes run images one per model call, batching applies to video frames only")
+        if self.video_segments > 1:
+            print(f"Segment-parallel video processing enabled: up to {self.video_segments} segments per video")
+        
+        self._model_loader = model_loader or (lambda name, engine, precision: load_inference_engine(name, engine, self.inference_threads, precision))
+        self._raise_load_errors = model_loader is not None  # Library callers get exceptions instead of sys.exit
+        self._detection_model_name = detection_model
+        self._model = None
+        self._detection_model = None
+        
+        if self.workers > 1 or self.video_segments > 1:
+            # Worker processes load their own models; this process only loads them if it ends up processing media itself
+            print("ℹ Model loading deferred until needed (worker processes load their own models)")
+        else:
+            self._load_models()
+    
+    @property
+    def model(self):
+        """Segmentation inference engine, loaded on first use when loading was deferred."""
+        if self._model is None:
+            self._load_models()
+        return self._model
+    
+    @model.setter
+    def model(self, value):
+        self._model = value
+    
+    @property
+    def detection_model(self):
+        """Object detection inference engine (only when object detection is enabled)."""
+        if self._model is None:
+            self._load_models()
+        return self._detection_model
+    
+    @detection_model.setter
+    def detection_model(self, value):
+        self._detection_model = value
+    
+    def _load_models(self):
+        """Load the segmentation model and, if enabled, the object detection model."""
         try:
-            self.model = YOLO(model_name)
+            self._model = self._model_loader(self.model_name, self.inference_engine, self.precision)
             print("✓ Model loaded successfully")
         except Exception as e:
             print(f"✗ Error loading model: {e}")
+            if self._raise_load_errors:
+                # Library callers (backend jobs, worker pools) handle the error themselves
+                raise RuntimeError(f"Could not load model {self.model_name} ({self.inference_engine}, {self.precision}): {e}") from e
             sys.exit(1)
         
         # Load object detection model if enabled
         if self.enable_object_detection:
-            print(f"Loading object detection model: {detection_model}...")
+            print(f"Loading object detection model: {self._detection_model_name}...")
             try:
-                self.detection_model = YOLO(detection_model)
+                self._detection_model = self._model_loader(self._detection_model_name, self.inference_engine, 'fp32')
                 print("✓ Object detection model loaded successfully")
             except Exception as e:
                 print(f"✗ Error loading object detection model: {e}")
                 print("⚠ Continuing without object detection")
                 self.enable_object_detection = False
     
-    def detect_humans_with_masks(self, image: np.ndarray, confidence: float = 0.5) -> List[Tuple[np.ndarray, Optional[np.ndarray]]]:
+    def detect_humans_with_masks(self, image: np.ndarray, confidence: float = 0.5) -> List[Tuple[np.ndarray, Optional[CropMask]]]:
         """
         Detect humans in an image using YOLO segmentation.
         
@@ -112,33 +1414,53 @@ class HumanBlurProcessor:
         Returns:
             List of tuples containing (bounding_box, segmentation_mask)
             - bounding_box: (x1, y1, x2, y2) as numpy array
-            - segmentation_mask: Binary mask as numpy array (H, W) or None if not available
+            - segmentation_mask: CropMask at model resolution, or None if not available
         """
-        results = self.model(image, conf=confidence, verbose=False)
+        # Only persons (class 0 in COCO) go through NMS and mask decoding
+        prediction = self.model.predict([image], confidence, classes=[0])[0]
         
-        detections = []
-        for result in results:
-            boxes = result.boxes
-            masks = result.masks if hasattr(result, 'masks') and result.masks is not None else None
-            
-            for idx, box in enumerate(boxes):
-                # Class 0 is 'person' in COCO dataset
-                if int(box.cls[0]) == 0:
-                    bbox = box.xyxy[0].cpu().numpy()
-                    
-                    # Get segmentation mask if available
-                    mask = None
-                    if masks is not None and self.use_segmentation:
-                        # Get mask data
-                        mask_data = masks[idx].data[0].cpu().numpy()
-                        # Resize mask to match image dimensions
-                        mask = cv2.resize(mask_data, (image.shape[1], image.shape[0]), interpolation=cv2.INTER_LINEAR)
-                        # Convert to binary mask
-                        mask = (mask > 0.5).astype(np.uint8)
-                    
-                    detections.append((bbox, mask))
+        return self._extract_human_detections(prediction)
+    
+    def detect_humans_with_masks_batch(self, images: List[np.ndarray], confidence: float = 0.5) -> List[List[Tuple[np.ndarray, Optional[CropMask]]]]:
+        """
+        Detect humans in several images with a single YOLO segmentation call.
         
-        return detections
+        Args:
+            images: List of input images as numpy arrays
+            confidence: Confidence threshold for detection
+            
+        Returns:
+            One list of (bounding_box, segmentation_mask) tuples per input image, in input order
+        """
+        if not images:
+            return []
+        
+        predictions = self.model.predict(images, confidence, classes=[0])
+        
+        return [self._extract_human_detections(prediction) for prediction in predictions]
+    
+    def _extract_human_detections(self, prediction: ModelPrediction) -> List[Tuple[np.ndarray, Optional[CropMask]]]:
+        """
+        Convert the model prediction for one image into (bounding_box, segmentation_mask) tuples for persons.
+        
+        Masks stay at model resolution as crop-local CropMasks; combine_masks
+        merges them there and upsamples the union to the image once.
+        
+        Args:
+            prediction: Model prediction for one image
+            
+        Returns:
+            List of tuples containing (bounding_box, segmentation_mask)
+        """
+        # Class 0 is 'person' in COCO dataset
+        person_indices = np.flatnonzero(prediction.classes == 0)
+        
+        # All person masks binarized in one call, then cropped to each person's extent
+        masks = None
+        if prediction.masks is not None and self.use_segmentation and len(person_indices):
+            masks = (prediction.masks[person_indices] > 0.5).view(np.uint8)
+        
+        return [(prediction.boxes[idx], CropMask.from_array(masks[i]) if masks is not None else None) for i, idx in enumerate(person_indices)]
     
     def detect_background_objects(self, image: np.ndarray, confidence: float = 0.5, frame_number: Optional[int] = None, timestamp: Optional[str] = None) -> List[Dict[str, Any]]:
         """
@@ -156,41 +1478,38 @@ class HumanBlurProcessor:
         if not self.enable_object_detection:
             return []
         
-        results = self.detection_model(image, conf=confidence, verbose=False)
+        prediction = self.detection_model.predict([image], confidence)[0]
         
         detections = []
-        for result in results:
-            boxes = result.boxes
-            
-            for box in boxes:
-                cls_id = int(box.cls[0])
-                
-                # Skip person class (class 0 in COCO dataset)
-                if cls_id == 0:
-                    continue
-                
-                label = self.detection_model.names[cls_id]
-                conf = float(box.conf[0])
-                xyxy = box.xyxy[0].cpu().numpy().tolist()
-                
-                detection_dict = {
-                    "label": label,
-                    "confidence": round(conf, 4),
-                    "bbox": {
-                        "x1": round(xyxy[0], 2),
-                        "y1": round(xyxy[1], 2),
-                        "x2": round(xyxy[2], 2),
-                        "y2": round(xyxy[3], 2)
-                    }
+        for box, score, class_id in zip(prediction.boxes, prediction.scores, prediction.classes):
+            cls_id = int(class_id)
+            
+            # Skip person class (class 0 in COCO dataset)
+            if cls_id == 0:
+                continue
+            
+            label = self.detection_model.names[cls_id]
+            conf = float(score)
+            xyxy = box.tolist()
+            
+            detection_dict = {
+                "label": label,
+                "confidence": round(conf, 4),
+                "bbox": {
+                    "x1": round(xyxy[0], 2),
+                    "y1": round(xyxy[1], 2),
+                    "x2": round(xyxy[2], 2),
+                    "y2": round(xyxy[3], 2)
                 }
-                
-                # Add frame/timestamp info for videos
-                if frame_number is not None:
-                    detection_dict["frame"] = frame_number
-                if timestamp is not None:
-                    detection_dict["timestamp"] = timestamp
-                
-                detections.append(detection_dict)
+            }
+            
+            # Add frame/timestamp info for videos
+            if frame_number is not None:
+                detection_dict["frame"] = frame_number
+            if timestamp is not None:
+                detection_dict["timestamp"] = timestamp
+            
+            detections.append(detection_dict)
         
         return detections
     
@@ -239,89 +1558,182 @@ class HumanBlurProcessor:
             print(f"  ✗ Error saving detections to JSON: {e}")
             return False
     
-    def apply_intense_blur(self, image: np.ndarray, kernel_size: int, passes: int = 3) -> np.ndarray:
+    def apply_intense_blur(self, image: np.ndarray, kernel_size: int, passes: int = 3, dst: Optional[np.ndarray] = None) -> np.ndarray:
         """
-        Apply multi-pass blur for more intense effect.
+        Apply multi-pass blur for more intense effect, using the configured blur engine.
         
         Args:
             image: Input image region
             kernel_size: Blur kernel size
             passes: Number of blur iterations
+            dst: Optional output array of the image's shape
             
         Returns:
             Intensely blurred image
         """
-        blurred = image.copy()
-        for _ in range(passes):
-            blurred = cv2.GaussianBlur(blurred, (kernel_size, kernel_size), 0)
-        return blurred
+        if dst is None and self._buffer_pool is not None:
+            dst = self._buffer_pool.get('blur', image.shape)
+        return intense_blur(image, kernel_size, passes, self.blur_engine, dst=dst)
     
-    def combine_masks(self, masks: List[np.ndarray]) -> np.ndarray:
+    def combine_masks(self, masks: List[Any], image_shape: Optional[Tuple[int, ...]] = None) -> Optional[CropMask]:
         """
         Combine multiple segmentation masks into a single unified mask.
         
+        The masks are merged at their own (model) resolution and the union is
+        upsampled to the image once, instead of resizing every mask to full size.
+        
         Args:
-            masks: List of binary segmentation masks
+            masks: List of binary segmentation masks (CropMasks or full-size arrays), all for the same mask shape
+            image_shape: Shape of the image to build the mask for (default: mask shape)
             
         Returns:
-            Combined binary mask where any pixel marked in any mask is marked in result
+            Combined CropMask where any pixel marked in any mask is marked in result
         """
         if not masks:
             return None
         
-        # Start with first mask
-        combined = masks[0].astype(np.float32)
+        # Logical OR over the union bounding box only
+        combined = CropMask.union([CropMask.from_array(mask) for mask in masks])
+        if combined is None:
+            return None
+        
+        if image_shape is None:
+            return combined
+        return self.upsample_mask(combined, image_shape)
+    
+    def upsample_mask(self, mask: Any, image_shape: Tuple[int, ...]) -> CropMask:
+        """
+        Resize a binary mask to the image size, interpolating only within its bounding box.
         
-        # Merge remaining masks using logical OR
-        for mask in masks[1:]:
-            combined = np.maximum(combined, mask.astype(np.float32))
+        Gives the same result as a full-frame bilinear cv2.resize followed by a 0.5 threshold,
+        except on exact 0.5 ties.
         
-        return combined
+        Args:
+            mask: Binary mask (CropMask or full-size array, at model resolution)
+            image_shape: Shape of the target image
+            
+        Returns:
+            CropMask for the image size
+        """
+        mask = CropMask.from_array(mask)
+        height, width = image_shape[:2]
+        mask_h, mask_w = mask.shape
+        if (mask_h, mask_w) == (height, width):
+            return mask
+        if mask.data.size == 0:
+            return CropMask.empty(image_shape)
+        
+        # One pixel of margin so interpolation at the crop edges sees the same neighbours as a full resize
+        source = mask.padded(1)
+        x0, y0, x1, y1 = source.bbox
+        scale_x, scale_y = mask_w / width, mask_h / height
+        dst_x0, dst_y0 = int(x0 / scale_x), int(y0 / scale_y)
+        dst_x1, dst_y1 = min(width, int(np.ceil(x1 / scale_x))), min(height, int(np.ceil(y1 / scale_y)))
+        
+        # Map destination pixel centres to source coordinates exactly like cv2.resize
+        transform = np.float32([
+            [scale_x, 0, (dst_x0 + 0.5) * scale_x - 0.5 - x0],
+            [0, scale_y, (dst_y0 + 0.5) * scale_y - 0.5 - y0],
+        ])
+        upsampled = cv2.warpAffine(source.data.astype(np.float32), transform, (dst_x1 - dst_x0, dst_y1 - dst_y0),
+                                   flags=cv2.INTER_LINEAR | cv2.WARP_INVERSE_MAP, borderMode=cv2.BORDER_REPLICATE)
+        return CropMask((upsampled > 0.5).view(np.uint8), dst_x0, dst_y0, (height, width))
     
-    def update_skin_tone_samples(self, image: np.ndarray, yolo_mask: np.ndarray):
+    def _dilate_mask(self, mask: Any, kernel_size: int) -> CropMask:
+        """
+        Dilate a binary mask with an elliptical kernel, working only on its padded crop.
+        
+        Large kernels are approximated according to self.morphology (see dilate_binary).
+        
+        Args:
+            mask: Binary mask (CropMask or full-size array)
+            kernel_size: Elliptical kernel diameter in pixels
+            
+        Returns:
+            Dilated CropMask
+        """
+        mask = CropMask.from_array(mask)
+        if mask.data.size == 0:
+            return mask
+        
+        # Grow the crop by the kernel reach so the dilation is not clipped
+        padded = mask.padded(kernel_size // 2 + 1)
+        dilated = dilate_binary(padded.data, kernel_size, self.morphology)
+        return CropMask(dilated, padded.x, padded.y, padded.shape)
+    
+    def update_skin_tone_samples(self, image: np.ndarray, yolo_mask: Any, ycrcb: Optional[Tuple[np.ndarray, int, int]] = None):
         """
         Update temporal tracking with skin tone samples from YOLO-detected regions.
         
         Args:
             image: Input image (BGR format)
-            yolo_mask: Binary mask from YOLO detection
+            yolo_mask: Binary mask from YOLO detection (CropMask or full-size array)
+            ycrcb: Optional (region, x, y) YCrCb conversion of an image region covering the mask,
+                   reused instead of converting again
         """
         if not self.enable_skin_detection:
             return
         
-        # Convert image to YCrCb color space
-        ycrcb = cv2.cvtColor(image, cv2.COLOR_BGR2YCrCb)
+        yolo_mask = CropMask.from_array(yolo_mask)
+        if yolo_mask.data.size == 0:
+            return
+        
+        # Convert only the masked region to YCrCb color space
+        x1, y1, x2, y2 = yolo_mask.bbox
+        if ycrcb is None:
+            region = cv2.cvtColor(image[y1:y2, x1:x2], cv2.COLOR_BGR2YCrCb)
+        else:
+            converted, x, y = ycrcb
+            region = converted[y1 - y:y2 - y, x1 - x:x2 - x]
+        
+        # Every 10th masked pixel (in raster order) is a sample, and only the newest
+        # max_skin_samples of them are kept, so gather just the rows holding those
+        step = 10
+        row_counts = np.cumsum(np.count_nonzero(yolo_mask.data, axis=1))
+        total = int(row_counts[-1])
+        if total == 0:
+            return
+        first = max(0, (total - 1) // step + 1 - self.skin_tone_samples.capacity) * step
+        row = int(np.searchsorted(row_counts, first, side='right'))
+        before = int(row_counts[row - 1]) if row > 0 else 0
         
         # Sample skin tones from the YOLO-detected region
-        mask_uint8 = (yolo_mask * 255).astype(np.uint8)
-        skin_pixels = ycrcb[mask_uint8 > 0]
-        
-        # Add samples to our temporal tracking (sample every 10th pixel to avoid too many samples)
-        if len(skin_pixels) > 0:
-            sampled_pixels = skin_pixels[::10]  # Sample every 10th pixel
-            self.skin_tone_samples.extend(sampled_pixels.tolist())
-            
-            # Keep only the most recent samples
-            if len(self.skin_tone_samples) > self.max_skin_samples:
-                self.skin_tone_samples = self.skin_tone_samples[-self.max_skin_samples:]
+        skin_pixels = region[row:][yolo_mask.data[row:] > 0]
+        self.skin_tone_samples.add(skin_pixels[first - before::step])
     
-    def detect_skin_tones_ycrcb(self, image: np.ndarray, search_mask: Optional[np.ndarray] = None) -> np.ndarray:
+    def detect_skin_tones_ycrcb(self, image: np.ndarray, search_mask: Optional[Any] = None, ycrcb: Optional[Tuple[np.ndarray, int, int]] = None) -> CropMask:
         """
         Detect skin tones in image using YCrCb color space with temporal tracking.
         
         Args:
             image: Input image (BGR format)
-            search_mask: Optional binary mask indicating where to search for skin tones
-                        (typically expanded YOLO regions)
+            search_mask: Optional binary mask (CropMask or full-size array) indicating where to
+                        search for skin tones (typically expanded YOLO regions)
+            ycrcb: Optional (region, x, y) YCrCb conversion of an image region covering the search
+                   mask padded by SKIN_MORPHOLOGY_MARGIN, reused instead of converting again
         
         Returns:
-            Binary mask of detected skin tones
+            CropMask of detected skin tones
         """
         if not self.enable_skin_detection:
-            return np.zeros(image.shape[:2], dtype=np.uint8)
+            return CropMask.empty(image.shape)
         
-        # Convert to YCrCb color space
-        ycrcb = cv2.cvtColor(image, cv2.COLOR_BGR2YCrCb)
+        # Only the search region (plus the reach of the clean-up morphology) is examined
+        if search_mask is not None:
+            search_mask = CropMask.from_array(search_mask)
+            if search_mask.data.size == 0:
+                return CropMask.empty(image.shape)
+            search_mask = search_mask.padded(self.SKIN_MORPHOLOGY_MARGIN)
+            x1, y1, x2, y2 = search_mask.bbox
+        else:
+            x1, y1, x2, y2 = 0, 0, image.shape[1], image.shape[0]
+        
+        # Convert to YCrCb color space (or reuse the caller's conversion)
+        if ycrcb is None:
+            ycrcb = cv2.cvtColor(image[y1:y2, x1:x2], cv2.COLOR_BGR2YCrCb)
+        else:
+            converted, x, y = ycrcb
+            ycrcb = converted[y1 - y:y2 - y, x1 - x:x2 - x]
         
         # Define base skin tone ranges in YCrCb (covers diverse skin tones)
         # These ranges are well-established for skin detection
@@ -333,62 +1745,80 @@ class HumanBlurProcessor:
         
         # If we have temporal samples, create an adaptive mask
         if len(self.skin_tone_samples) > 10:  # Need at least 10 samples
-            # Calculate mean and std of our temporal samples
-            samples_array = np.array(self.skin_tone_samples)
-            mean_skin = samples_array.mean(axis=0)
-            std_skin = samples_array.std(axis=0)
+            # Mean and std of our temporal samples (running statistics)
+            mean_skin, std_skin = self.skin_tone_samples.mean_std()
             
             # Create adaptive range based on temporal data (±2 standard deviations)
             adaptive_lower = np.clip(mean_skin - 2 * std_skin, 0, 255).astype(np.uint8)
             adaptive_upper = np.clip(mean_skin + 2 * std_skin, 0, 255).astype(np.uint8)
             
-            # Create adaptive mask
+            # Create adaptive mask and combine it with the base mask (union)
             adaptive_mask = cv2.inRange(ycrcb, adaptive_lower, adaptive_upper)
-            
-            # Combine base and adaptive masks (union)
-            skin_mask = cv2.bitwise_or(skin_mask, adaptive_mask)
+            cv2.bitwise_or(skin_mask, adaptive_mask, dst=skin_mask)
         
         # Apply search mask if provided (only detect skin in specified regions)
         if search_mask is not None:
-            search_mask_uint8 = (search_mask * 255).astype(np.uint8)
-            skin_mask = cv2.bitwise_and(skin_mask, search_mask_uint8)
+            skin_mask = cv2.bitwise_and(skin_mask, skin_mask, mask=search_mask.data)
         
         # Apply morphological operations to clean up the mask
         # Remove noise
-        kernel_open = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (3, 3))
-        skin_mask = cv2.morphologyEx(skin_mask, cv2.MORPH_OPEN, kernel_open, iterations=1)
+        skin_mask = cv2.morphologyEx(skin_mask, cv2.MORPH_OPEN, structuring_element(cv2.MORPH_ELLIPSE, 3), iterations=1)
         
         # Fill gaps and smooth
-        kernel_close = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (5, 5))
-        skin_mask = cv2.morphologyEx(skin_mask, cv2.MORPH_CLOSE, kernel_close, iterations=2)
+        skin_mask = cv2.morphologyEx(skin_mask, cv2.MORPH_CLOSE, structuring_element(cv2.MORPH_ELLIPSE, 5), iterations=2)
         
-        # Convert to float mask
-        return (skin_mask > 127).astype(np.float32)
+        return CropMask((skin_mask > 127).view(np.uint8), x1, y1, image.shape[:2])
+    
+    def reset_skin_tracking(self):
+        """Forget the temporal skin tone samples, e.g. before starting an unrelated file."""
+        self.skin_tone_samples.clear()
     
-    def create_expanded_search_region(self, mask: np.ndarray, expansion_pixels: int = 75) -> np.ndarray:
+    def add_skin_tones(self, image: np.ndarray, yolo_mask: Any) -> CropMask:
+        """
+        Extend a YOLO mask with skin tones found around it, updating the temporal samples first.
+        
+        The search region is converted to YCrCb once and shared by sampling and detection.
+        
+        Args:
+            image: Input image (BGR format)
+            yolo_mask: Binary mask from YOLO detection (CropMask or full-size array)
+            
+        Returns:
+            Combined CropMask (union of the YOLO and skin tone masks)
+        """
+        yolo_mask = CropMask.from_array(yolo_mask)
+        if yolo_mask.data.size == 0:
+            return yolo_mask
+        
+        # Create expanded search region
+        search_region = self.create_expanded_search_region(yolo_mask, expansion_pixels=75)
+        x1, y1, x2, y2 = search_region.padded_bbox(self.SKIN_MORPHOLOGY_MARGIN)
+        ycrcb = (cv2.cvtColor(image[y1:y2, x1:x2], cv2.COLOR_BGR2YCrCb), x1, y1)
+        
+        # Update temporal tracking with skin tone samples from YOLO detections
+        self.update_skin_tone_samples(image, yolo_mask, ycrcb=ycrcb)
+        
+        # Detect skin tones within the search region
+        skin_mask = self.detect_skin_tones_ycrcb(image, search_mask=search_region, ycrcb=ycrcb)
+        
+        # Combine YOLO mask with skin tone mask
+        return self.combine_yolo_and_skin_masks(yolo_mask, skin_mask)
+    
+    def create_expanded_search_region(self, mask: Any, expansion_pixels: int = 75) -> CropMask:
         """
         Create an expanded search region around YOLO detections for skin tone detection.
         
         Args:
-            mask: Binary YOLO detection mask
+            mask: Binary YOLO detection mask (CropMask or full-size array)
             expansion_pixels: Number of pixels to expand (default: 75 for wider search)
         
         Returns:
-            Expanded binary mask for searching
+            Expanded CropMask for searching
         """
-        # Convert to uint8 for morphological operations
-        mask_uint8 = (mask * 255).astype(np.uint8)
-        
-        # Create a large kernel for expansion
-        kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (expansion_pixels, expansion_pixels))
-        
         # Dilate to create search region
-        expanded_mask = cv2.dilate(mask_uint8, kernel, iterations=1)
-        
-        # Convert back to float mask
-        return (expanded_mask > 127).astype(np.float32)
+        return self._dilate_mask(mask, expansion_pixels)
     
-    def combine_yolo_and_skin_masks(self, yolo_mask: np.ndarray, skin_mask: np.ndarray) -> np.ndarray:
+    def combine_yolo_and_skin_masks(self, yolo_mask: Any, skin_mask: Any) -> CropMask:
         """
         Combine YOLO detection mask with skin tone detection mask.
         
@@ -397,110 +1827,150 @@ class HumanBlurProcessor:
             skin_mask: Binary mask from skin tone detection
         
         Returns:
-            Combined binary mask (union of both masks)
+            Combined CropMask (union of both masks)
         """
         # Union of both masks - mark a pixel if either mask detects it
-        combined = np.maximum(yolo_mask, skin_mask)
-        return combined
+        yolo_mask = CropMask.from_array(yolo_mask)
+        combined = CropMask.union([yolo_mask, CropMask.from_array(skin_mask)])
+        return combined if combined is not None else yolo_mask
     
-    def expand_mask_to_edges(self, mask: np.ndarray, expansion_pixels: int = 25) -> np.ndarray:
+    def expand_mask_to_edges(self, mask: Any, expansion_pixels: int = 25) -> CropMask:
         """
         Expand segmentation mask using morphological dilation to ensure processing 
         reaches frame edges when people are detected near borders.
         
         Args:
-            mask: Binary segmentation mask
+            mask: Binary segmentation mask (CropMask or full-size array)
             expansion_pixels: Number of pixels to expand the mask (default: 25 to cover the 15-20 pixel border issue)
             
         Returns:
-            Expanded binary mask
+            Expanded CropMask
         """
-        # Convert to uint8 for morphological operations
-        mask_uint8 = (mask * 255).astype(np.uint8)
-        
-        # Create a larger elliptical kernel for expansion
-        # This ensures smooth expansion that reaches edges
-        kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (expansion_pixels, expansion_pixels))
-        
-        # Dilate the mask to expand it
-        expanded_mask = cv2.dilate(mask_uint8, kernel, iterations=1)
-        
-        # Convert back to binary float mask
-        expanded_mask = (expanded_mask > 127).astype(np.float32)
-        
-        return expanded_mask
+        # Dilate with an elliptical kernel for a smooth expansion that reaches edges
+        return self._dilate_mask(mask, expansion_pixels)
     
-    def blur_with_mask(self, image: np.ndarray, mask: np.ndarray, bbox: np.ndarray) -> np.ndarray:
+    def blur_with_mask(self, image: np.ndarray, mask: Any, bbox: np.ndarray, dst: Optional[np.ndarray] = None) -> np.ndarray:
         """
         Apply blur to image using segmentation mask (lasso effect).
         
         Args:
             image: Input image
-            mask: Binary segmentation mask (can be combined from multiple detections)
+            mask: Binary segmentation mask, CropMask or full-size array (can be combined from multiple detections)
             bbox: Bounding box (x1, y1, x2, y2) - not used but kept for compatibility
+            dst: Output image, may be image itself to work in place (default: a new copy)
             
         Returns:
             Image with masked region blurred
         """
-        result = image.copy()
+        result = self._output_image(image, dst)
         
         # Expand mask to ensure processing reaches frame edges (fixes border issue)
-        full_mask = self.expand_mask_to_edges(mask)
-        
-        # Apply intense blur to entire image
-        blurred_full = self.apply_intense_blur(image, self.blur_intensity, self.blur_passes)
+        crop_mask = self.expand_mask_to_edges(mask)
+        if crop_mask.data.size == 0:
+            return result
         
-        # Blend original and blurred using mask
-        # Expand mask to 3 channels for color images
-        if len(image.shape) == 3:
-            full_mask = np.stack([full_mask] * 3, axis=-1)
+        # Blur only around the masked people. Each region keeps a margin of the full blur
+        # reach, so masked pixels come out exactly as if the whole image had been blurred.
+        margin = blur_reach(self.blur_intensity, self.blur_passes, self.blur_engine)
+        mask_x1, mask_y1, mask_x2, mask_y2 = crop_mask.bbox
         
-        # Use mask to blend: result = original * (1 - mask) + blurred * mask
-        result = (image * (1 - full_mask) + blurred_full * full_mask).astype(np.uint8)
+        for x1, y1, x2, y2 in self._blur_regions(crop_mask, margin):
+            blurred_region = self.apply_intense_blur(image[y1:y2, x1:x2], self.blur_intensity, self.blur_passes)
+            
+            # Copy blurred pixels in where the mask is set, inside the part of the region covered by the mask crop
+            bx1, by1 = max(x1, mask_x1), max(y1, mask_y1)
+            bx2, by2 = min(x2, mask_x2), min(y2, mask_y2)
+            region_mask = crop_mask.data[by1 - mask_y1:by2 - mask_y1, bx1 - mask_x1:bx2 - mask_x1]
+            blurred = blurred_region[by1 - y1:by2 - y1, bx1 - x1:bx2 - x1]
+            cv2.copyTo(blurred, region_mask, result[by1:by2, bx1:bx2])
         
         return result
     
-    def black_mask_with_mask(self, image: np.ndarray, mask: np.ndarray, bbox: np.ndarray) -> np.ndarray:
+    def _blur_regions(self, mask: CropMask, margin: int) -> List[Tuple[int, int, int, int]]:
+        """
+        Rectangles to blur for a mask: the bounding box of each connected component
+        grown by margin (clipped to the image), with overlapping rectangles merged.
+        
+        Args:
+            mask: Binary mask to cover
+            margin: Pixels added on each side of every component
+            
+        Returns:
+            Disjoint (x1, y1, x2, y2) rectangles in image coordinates
+        """
+        height, width = mask.shape
+        count, _, stats, _ = cv2.connectedComponentsWithStats(mask.data, connectivity=8)
+        
+        rects = []
+        for left, top, w, h, _ in stats[1:count].tolist():  # Label 0 is the background
+            left, top = left + mask.x, top + mask.y
+            rects.append((max(0, left - margin), max(0, top - margin), min(width, left + w + margin), min(height, top + h + margin)))
+        
+        # Merge overlapping rectangles so no pixel is blurred twice
+        merged = True
+        while merged:
+            merged = False
+            disjoint = []
+            for rect in rects:
+                for idx, other in enumerate(disjoint):
+                    if rect[0] < other[2] and other[0] < rect[2] and rect[1] < other[3] and other[1] < rect[3]:
+                        disjoint[idx] = (min(rect[0], other[0]), min(rect[1], other[1]), max(rect[2], other[2]), max(rect[3], other[3]))
+                        merged = True
+                        break
+                else:
+                    disjoint.append(rect)
+            rects = disjoint
+        
+        return rects
+    
+    def black_mask_with_mask(self, image: np.ndarray, mask: Any, bbox: np.ndarray, dst: Optional[np.ndarray] = None) -> np.ndarray:
         """
         Apply solid black color to image using segmentation mask (lasso effect).
         
         Args:
             image: Input image
-            mask: Binary segmentation mask (can be combined from multiple detections)
+            mask: Binary segmentation mask, CropMask or full-size array (can be combined from multiple detections)
             bbox: Bounding box (x1, y1, x2, y2) - not used but kept for compatibility
+            dst: Output image, may be image itself to work in place (default: a new copy)
             
         Returns:
             Image with masked region replaced with solid black
         """
-        result = image.copy()
+        result = self._output_image(image, dst)
         
         # Expand mask to ensure processing reaches frame edges (fixes border issue)
-        full_mask = self.expand_mask_to_edges(mask)
+        crop_mask = self.expand_mask_to_edges(mask)
+        if crop_mask.data.size == 0:
+            return result
         
-        # Create black image with same shape
-        black_image = np.zeros_like(image)
-        
-        # Expand mask to 3 channels for color images
-        if len(image.shape) == 3:
-            full_mask = np.stack([full_mask] * 3, axis=-1)
-        
-        # Use mask to blend: result = original * (1 - mask) + black * mask
-        result = (image * (1 - full_mask) + black_image * full_mask).astype(np.uint8)
+        # Zero the masked pixels in place, only inside the mask's bounding box
+        x1, y1, x2, y2 = crop_mask.bbox
+        region = result[y1:y2, x1:x2]
+        cv2.copyTo(np.zeros_like(region), crop_mask.data, region)
         
         return result
     
-    def blur_with_box(self, image: np.ndarray, bbox: np.ndarray) -> np.ndarray:
+    def _output_image(self, image: np.ndarray, dst: Optional[np.ndarray]) -> np.ndarray:
+        """Return the array a blend function writes into: a copy of image, or dst holding image's pixels."""
+        if dst is None:
+            return image.copy()
+        if dst is not image:
+            np.copyto(dst, image)
+        return dst
+    
+    def blur_with_box(self, image: np.ndarray, bbox: np.ndarray, dst: Optional[np.ndarray] = None) -> np.ndarray:
         """
         Apply blur to bounding box region (fallback method).
         
         Args:
             image: Input image
             bbox: Bounding box (x1, y1, x2, y2)
+            dst: Output image, may be image itself to work in place (default: a new copy)
             
         Returns:
             Image with box region blurred
         """
-        result = image.copy()
+        result = self._output_image(image, dst)
         x1, y1, x2, y2 = map(int, bbox)
         
         # Expand bounding box to fix border issue (add 25 pixels padding)
@@ -519,18 +1989,19 @@ class HumanBlurProcessor:
         
         return result
     
-    def black_mask_with_box(self, image: np.ndarray, bbox: np.ndarray) -> np.ndarray:
+    def black_mask_with_box(self, image: np.ndarray, bbox: np.ndarray, dst: Optional[np.ndarray] = None) -> np.ndarray:
         """
         Apply black mask to bounding box region (fallback method).
         
         Args:
             image: Input image
             bbox: Bounding box (x1, y1, x2, y2)
+            dst: Output image, may be image itself to work in place (default: a new copy)
             
         Returns:
             Image with box region replaced with solid black
         """
-        result = image.copy()
+        result = self._output_image(image, dst)
         x1, y1, x2, y2 = map(int, bbox)
         
         # Expand bounding box to fix border issue (add 25 pixels padding)
@@ -648,97 +2119,105 @@ class HumanBlurProcessor:
             # Detect humans with segmentation masks
             detections = self.detect_humans_with_masks(image, confidence)
             
-            if not detections:
-                print(f"  No humans detected in {image_path.name}")
-                return False
-            
-            print(f"  Detected {len(detections)} human(s) in {image_path.name}")
-            
-            # Detect background objects (excluding humans) if enabled
-            if self.enable_object_detection:
-                print(f"  Detecting background objects...")
-                object_detections = self.detect_background_objects(image, confidence)
-                self.all_detections.extend(object_detections)
-                print(f"  ✓ Detected {len(object_detections)} background object(s)")
-            
-            # Separate detections into those with masks and those without
-            detections_with_masks = [(bbox, mask) for bbox, mask in detections if mask is not None and self.use_segmentation]
-            detections_without_masks = [(bbox, mask) for bbox, mask in detections if mask is None or not self.use_segmentation]
+            return self._mask_and_save_image(image_path, image, detections, output_path, confidence, start_time)
             
-            result = image.copy()
+        except Exception as e:
+            print(f"✗ Error processing {image_path}: {e}")
+            import traceback
+            traceback.print_exc()
+            return False
+    
+    def _mask_and_save_image(self, image_path: Path, image: np.ndarray, detections: List[Tuple[np.ndarray, Optional[CropMask]]], output_path: Optional[Path], confidence: float, start_time: float) -> bool:
+        """
+        Mask detected humans in a loaded image and save the result (plus detections JSON if enabled).
+        
+        Args:
+            image_path: Path to input image
+            image: Loaded image (BGR format)
+            detections: List of (bounding_box, segmentation_mask) tuples for this image
+            output_path: Path for output image (optional)
+            confidence: Detection confidence threshold (used for object detection)
+            start_time: Time at which processing of this image started
             
-            # Step 1: Combine all segmentation masks and apply mask once
-            if detections_with_masks:
-                print(f"  Combining masks from {len(detections_with_masks)} person(s)...")
-                masks_only = [mask for _, mask in detections_with_masks]
-                combined_mask = self.combine_masks(masks_only)
+        Returns:
+            True if successful, False otherwise
+        """
+        if not detections:
+            print(f"  No humans detected in {image_path.name}")
+            return False
+        
+        print(f"  Detected {len(detections)} human(s) in {image_path.name}")
+        
+        # Detect background objects (excluding humans) if enabled
+        if self.enable_object_detection:
+            print(f"  Detecting background objects...")
+            object_detections = self.detect_background_objects(image, confidence)
+            self.all_detections.extend(object_detections)
+            print(f"  ✓ Detected {len(object_detections)} background object(s)")
+        
+        # Separate detections into those with masks and those without
+        detections_with_masks = [(bbox, mask) for bbox, mask in detections if mask is not None and self.use_segmentation]
+        detections_without_masks = [(bbox, mask) for bbox, mask in detections if mask is None or not self.use_segmentation]
+        
+        result = image.copy()
+        
+        # Step 1: Combine all segmentation masks and apply mask once
+        if detections_with_masks:
+            print(f"  Combining masks from {len(detections_with_masks)} person(s)...")
+            masks_only = [mask for _, mask in detections_with_masks]
+            combined_mask = self.combine_masks(masks_only, image.shape)
+            
+            if combined_mask is not None:
+                # Detect skin tones in expanded regions if enabled
+                if self.enable_skin_detection:
+                    print(f"  Detecting skin tones in expanded regions...")
+                    combined_mask = self.add_skin_tones(image, combined_mask)
+                    print(f"  ✓ Skin tone detection applied")
                 
-                if combined_mask is not None:
-                    # Update temporal tracking with skin tone samples from YOLO detections
-                    if self.enable_skin_detection:
-                        self.update_skin_tone_samples(image, combined_mask)
-                    
-                    # Detect skin tones in expanded regions if enabled
-                    if self.enable_skin_detection:
-                        print(f"  Detecting skin tones in expanded regions...")
-                        # Create expanded search region
-                        search_region = self.create_expanded_search_region(combined_mask, expansion_pixels=75)
-                        # Detect skin tones within the search region
-                        skin_mask = self.detect_skin_tones_ycrcb(image, search_mask=search_region)
-                        # Combine YOLO mask with skin tone mask
-                        combined_mask = self.combine_yolo_and_skin_masks(combined_mask, skin_mask)
-                        print(f"  ✓ Skin tone detection applied")
-                    
-                    if self.mask_type == 'blur':
-                        print(f"  Applying unified lasso blur to all detected people...")
-                        result = self.blur_with_mask(result, combined_mask, None)
-                        print(f"  ✓ Lasso blur applied to {len(detections_with_masks)} person(s)")
-                    else:  # black mask
-                        print(f"  Applying unified black mask to all detected people...")
-                        result = self.black_mask_with_mask(result, combined_mask, None)
-                        print(f"  ✓ Black mask applied to {len(detections_with_masks)} person(s)")
-            
-            # Step 2: Apply box mask for any detections without masks (fallback)
-            if detections_without_masks:
                 if self.mask_type == 'blur':
-                    print(f"  Applying box blur fallback to {len(detections_without_masks)} person(s)...")
-                    for bbox, _ in detections_without_masks:
-                        result = self.blur_with_box(result, bbox)
-                    print(f"  ✓ Box blur applied to {len(detections_without_masks)} person(s)")
+                    print(f"  Applying unified lasso blur to all detected people...")
+                    result = self.blur_with_mask(result, combined_mask, None)
+                    print(f"  ✓ Lasso blur applied to {len(detections_with_masks)} person(s)")
                 else:  # black mask
-                    print(f"  Applying box black mask fallback to {len(detections_without_masks)} person(s)...")
-                    for bbox, _ in detections_without_masks:
-                        result = self.black_mask_with_box(result, bbox)
-                    print(f"  ✓ Box black mask applied to {len(detections_without_masks)} person(s)")
-            
-            # Determine output path
-            if output_path is None:
-                output_suffix = image_path.suffix
-                # Convert HEIC to JPG for output
-                if output_suffix.lower() in {'.heic', '.heif'}:
-                    output_suffix = '.jpg'
-                output_path = image_path.parent / f"{image_path.stem}{self.filename_suffix}{output_suffix}"
-            
-            # Save result
-            if self.save_image(result, output_path, image_path):
-                # Save object detections to JSON if enabled
-                if self.enable_object_detection and self.all_detections:
-                    json_path = image_path.parent / f"{image_path.stem}-detections.json"
-                    if self.save_detections_to_json(json_path, image_path):
-                        print(f"  ✓ Saved {len(self.all_detections)} detection(s) to {json_path.name}")
-                
-                # Calculate and display processing time
-                processing_time = time.time() - start_time
-                print(f"  Processing time: {processing_time:.2f} seconds")
-                print(f"  ✓ Saved to {output_path.name}")
-                return True
-            else:
-                return False
+                    print(f"  Applying unified black mask to all detected people...")
+                    result = self.black_mask_with_mask(result, combined_mask, None)
+                    print(f"  ✓ Black mask applied to {len(detections_with_masks)} person(s)")
+        
+        # Step 2: Apply box mask for any detections without masks (fallback)
+        if detections_without_masks:
+            if self.mask_type == 'blur':
+                print(f"  Applying box blur fallback to {len(detections_without_masks)} person(s)...")
+                for bbox, _ in detections_without_masks:
+                    result = self.blur_with_box(result, bbox)
+                print(f"  ✓ Box blur applied to {len(detections_without_masks)} person(s)")
+            else:  # black mask
+                print(f"  Applying box black mask fallback to {len(detections_without_masks)} person(s)...")
+                for bbox, _ in detections_without_masks:
+                    result = self.black_mask_with_box(result, bbox)
+                print(f"  ✓ Box black mask applied to {len(detections_without_masks)} person(s)")
+        
+        # Determine output path
+        if output_path is None:
+            output_suffix = image_path.suffix
+            # Convert HEIC to JPG for output
+            if output_suffix.lower() in {'.heic', '.heif'}:
+                output_suffix = '.jpg'
+            output_path = image_path.parent / f"{image_path.stem}{self.filename_suffix}{output_suffix}"
+        
+        # Save result
+        if self.save_image(result, output_path, image_path):
+            # Save object detections to JSON if enabled
+            if self.enable_object_detection and self.all_detections:
+                json_path = image_path.parent / f"{image_path.stem}-detections.json"
+                if self.save_detections_to_json(json_path, image_path):
+                    print(f"  ✓ Saved {len(self.all_detections)} detection(s) to {json_path.name}")
             
-        except Exception as e:
-            print(f"✗ Error processing {image_path}: {e}")
-            import traceback
-            traceback.print_exc()
+            # Calculate and display processing time
+            processing_time = time.time() - start_time
+            print(f"  Processing time: {processing_time:.2f} seconds")
+            print(f"  ✓ Saved to {output_path.name}")
+            return True
+        else:
             return False
     
     def check_ffmpeg_available(self) -> bool:
@@ -782,11 +2261,11 @@ class HumanBlurProcessor:
     
     def merge_audio(self, video_path: Path, audio_path: Path, output_path: Path) -> bool:
         """
-        Merge audio into video using ffmpeg.
+        Merge audio into video using ffmpeg (stream copy, no re-encoding).
         
         Args:
             video_path: Path to video file (without audio)
-            audio_path: Path to audio file
+            audio_path: Path to a file with an audio track, e.g. the source video or an extracted track
             output_path: Path for output video
             
         Returns:
@@ -796,20 +2275,239 @@ class HumanBlurProcessor:
             subprocess.run([
                 'ffmpeg', '-i', str(video_path),
                 '-i', str(audio_path),
-                '-c:v', 'copy',  # Copy video codec
-                '-c:a', 'aac',  # Encode audio to AAC
-                '-strict', 'experimental',
+                '-map', '0:v:0',
+                '-map', '1:a:0?',  # First audio track, if there is one
+                '-c', 'copy',  # Copy video and audio codecs
                 '-y',  # Overwrite output file
                 str(output_path)
             ], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
             return True
-        except subprocess.CalledProcessError:
+        except (subprocess.CalledProcessError, FileNotFoundError):
+            return False
+    
+    def find_segment_split_times(self, video_path: Path, segments: int) -> List[float]:
+        """
+        Choose keyframe timestamps that split a video into roughly equal-length segments.
+        
+        Args:
+            video_path: Path to input video
+            segments: Desired number of segments
+            
+        Returns:
+            Sorted split timestamps in seconds (segments - 1 at most), empty if the video
+            cannot be split (ffprobe missing, too few keyframes, ...)
+        """
+        try:
+            # Read packet flags only - keyframes are found without decoding any frames
+            probe = subprocess.run([
+                'ffprobe', '-v', 'error',
+                '-select_streams', 'v:0',
+                '-show_entries', 'packet=pts_time,flags',
+                '-of', 'csv=p=0',
+                str(video_path)
+            ], stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, check=True, text=True)
+        except (subprocess.CalledProcessError, FileNotFoundError):
+            return []
+        
+        keyframe_times = []
+        last_time = 0.0
+        for line in probe.stdout.splitlines():
+            fields = line.strip().split(',')
+            if len(fields) < 2 or fields[0] in ('', 'N/A'):
+                continue
+            pts_time = float(fields[0])
+            last_time = max(last_time, pts_time)
+            if 'K' in fields[1] and pts_time > 0:
+                keyframe_times.append(pts_time)
+        
+        keyframe_times.sort()
+        if not keyframe_times or last_time <= 0:
+            return []
+        
+        # Pick the keyframe closest to each ideal split point, keeping splits strictly increasing
+        split_times = []
+        for index in range(1, segments):
+            target = last_time * index / segments
+            candidates = [t for t in keyframe_times if not split_times or t > split_times[-1]]
+            if not candidates:
+                break
+            split_time = min(candidates, key=lambda t: abs(t - target))
+            if split_time < last_time:
+                split_times.append(split_time)
+        
+        return split_times
+    
+    def split_video_at_times(self, video_path: Path, split_times: List[float], output_dir: Path) -> List[Path]:
+        """
+        Losslessly split the video stream of a file at the given keyframe timestamps (stream copy).
+        
+        Args:
+            video_path: Path to input video
+            split_times: Keyframe timestamps in seconds to split at
+            output_dir: Directory for the segment files
+            
+        Returns:
+            Segment file paths in playback order, empty list if splitting failed
+        """
+        segment_pattern = output_dir / f"segment_%04d{video_path.suffix}"
+        try:
+            subprocess.run([
+                'ffmpeg', '-i', str(video_path),
+                '-map', '0:v:0',
+                '-an',  # Audio is muxed once from the source after concatenation
+                '-c', 'copy',
+                '-f', 'segment',
+                '-segment_times', ','.join(f"{t:.6f}" for t in split_times),
+                '-reset_timestamps', '1',
+                '-y',
+                str(segment_pattern)
+            ], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+        except (subprocess.CalledProcessError, FileNotFoundError):
+            return []
+        
+        return sorted(output_dir.glob(f"segment_*{video_path.suffix}"))
+    
+    def concat_videos(self, segment_paths: List[Path], output_path: Path, audio_source: Optional[Path] = None) -> bool:
+        """
+        Losslessly concatenate video segments (stream copy), optionally copying the audio
+        track of audio_source into the result in the same pass.
+        
+        Args:
+            segment_paths: Segment files in playback order (same codec and resolution)
+            output_path: Path for output video
+            audio_source: Optional file whose audio track is muxed into the output
+            
+        Returns:
+            True if successful, False otherwise
+        """
+        list_path = output_path.parent / f".{output_path.stem}-segments.txt"
+        try:
+            with open(list_path, 'w') as f:
+                for segment_path in segment_paths:
+                    escaped = str(segment_path.resolve()).replace("'", "'\\''")
+                    f.write(f"file '{escaped}'\n")
+            
+            command = ['ffmpeg', '-f', 'concat', '-safe', '0', '-i', str(list_path)]
+            if audio_source is not None:
+                command += ['-i', str(audio_source), '-map', '0:v:0', '-map', '1:a?', '-c:a', 'copy', '-shortest']
+            command += ['-c:v', 'copy', '-y', str(output_path)]
+            
+            subprocess.run(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+            return True
+        except (subprocess.CalledProcessError, FileNotFoundError, OSError):
             return False
+        finally:
+            if list_path.exists():
+                list_path.unlink()
+    
+    def process_video_in_segments(self, video_path: Path, split_times: List[float], output_path: Path = None, confidence: float = 0.5) -> bool:
+        """
+        Process one video as keyframe-aligned segments on parallel worker processes, then
+        concatenate the processed segments and mux the original audio once.
+        
+        Note: frame_interval and skin tone tracking restart at the beginning of each segment.
+        
+        Args:
+            video_path: Path to input video
+            split_times: Keyframe timestamps in seconds (see find_segment_split_times)
+            output_path: Path for output video (optional)
+            confidence: Detection confidence threshold
+            
+        Returns:
+            True if successful, False otherwise
+        """
+        start_time = time.time()
+        
+        if output_path is None:
+            output_path = video_path.parent / f"{video_path.stem}{self.filename_suffix}{video_path.suffix}"
+        
+        cap = cv2.VideoCapture(str(video_path))
+        fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+        total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        cap.release()
+        
+        with tempfile.TemporaryDirectory(prefix='pyxelnyx-segments-') as temp_dir:
+            temp_dir = Path(temp_dir)
+            
+            print(f"  Splitting video into {len(split_times) + 1} segments at keyframes...")
+            segment_paths = self.split_video_at_times(video_path, split_times, temp_dir)
+            if len(segment_paths) < 2:
+                print(f"  ✗ Error: Could not split video into segments")
+                return False
+            print(f"  ✓ Created {len(segment_paths)} segments, processing in parallel...")
+            
+            output_segments = [temp_dir / f"processed_{segment_path.name}" for segment_path in segment_paths]
+            segment_progress = [0] * len(segment_paths)
+            segment_results: List[Optional[Dict[str, Any]]] = [None] * len(segment_paths)
+            
+            def on_event(event: str, data: Dict[str, Any]):
+                if event != 'segment_progress':
+                    return
+                segment_progress[data['segment']] = data['current']
+                done = sum(segment_progress)
+                if self.progress_callback:
+                    self.progress_callback(done, total_frames)
+                print(f"  Processing frame {done}/{total_frames} ({done*100//max(1, total_frames)}%)", end='\r')
+            
+            def on_result(task_index: int, result: Optional[Dict[str, Any]], error: Optional[Exception]):
+                if error is not None:
+                    print(f"\n  ✗ Error processing segment {task_index + 1}: {error}")
+                segment_results[task_index] = result
+            
+            # Workers render video only; audio is taken from the source in the final concat
+            worker_settings = dict(self.processor_settings, keep_audio=False, video_segments=1)
+            self._run_worker_pool(
+                len(segment_paths),
+                worker_settings,
+                _process_video_segment_in_worker,
+                [(index, str(segment_path), str(output_segment), confidence)
+                 for index, (segment_path, output_segment) in enumerate(zip(segment_paths, output_segments))],
+                on_event=on_event,
+                on_result=on_result,
+            )
+            
+            if not all(result and result['success'] for result in segment_results):
+                print(f"\n  ✗ Error: One or more segments failed to process")
+                return False
+            
+            # Shift per-segment frame numbers of object detections to whole-video positions
+            self.video_stats = {'frames_read': 0, 'frames_inferred': 0, 'inferences_skipped': 0, 'scene_cuts': 0, 'frames_with_humans': 0, 'frames_written': 0}
+            for result in segment_results:
+                for detection in result['detections']:
+                    detection['frame'] += self.video_stats['frames_read']
+                    detection['timestamp'] = self.format_timestamp(detection['frame'] - 1, fps)
+                    self.all_detections.append(detection)
+                for key in self.video_stats:
+                    self.video_stats[key] += result['video_stats'].get(key, 0)
+            
+            print(f"\n  ✓ Processed {self.video_stats['frames_read']} frames ({self.video_stats['frames_with_humans']} frames with humans detected)")
+            
+            keep_audio = self.keep_audio and self.frame_interval == 1
+            print(f"  Concatenating segments{' and muxing audio' if keep_audio else ''}...")
+            if not self.concat_videos(output_segments, output_path, audio_source=video_path if keep_audio else None):
+                if not (keep_audio and self.concat_videos(output_segments, output_path)):
+                    print(f"  ✗ Error: Could not concatenate processed segments")
+                    return False
+                print(f"  ⚠ Failed to copy audio, saving video without audio")
+        
+        # Save object detections to JSON if enabled
+        if self.enable_object_detection and self.all_detections:
+            json_path = video_path.parent / f"{video_path.stem}-detections.json"
+            if self.save_detections_to_json(json_path, video_path):
+                print(f"  ✓ Saved {len(self.all_detections)} detection(s) to {json_path.name}")
+        
+        processing_time = time.time() - start_time
+        print(f"  Processing time: {processing_time:.2f} seconds")
+        print(f"  ✓ Saved to {output_path.name}")
+        return True
     
     def process_video(self, video_path: Path, output_path: Path = None, confidence: float = 0.5) -> bool:
         """
         Process a video: detect humans and blur them frame by frame using segmentation.
         
+        With ffmpeg installed (and video_io 'ffmpeg'), frames are decoded and encoded through
+        ffmpeg pipes and the source audio is stream-copied in the same encode pass.
+        
         Args:
             video_path: Path to input video
             output_path: Path for output video (optional)
@@ -818,9 +2516,16 @@ class HumanBlurProcessor:
         Returns:
             True if successful, False otherwise
         """
+        cap = None
+        out = None
         temp_video_path = None
-        audio_path = None
-        has_audio = False
+        
+        # Split long videos across worker processes when segment-parallel mode is enabled
+        if self.video_segments > 1:
+            split_times = self.find_segment_split_times(video_path, self.video_segments)
+            if split_times:
+                return self.process_video_in_segments(video_path, split_times, output_path, confidence)
+            print(f"  ℹ Could not split video at keyframes (ffprobe missing or too few keyframes) - processing as one segment")
         
         try:
             # Start timing
@@ -855,18 +2560,13 @@ class HumanBlurProcessor:
             if output_path is None:
                 output_path = video_path.parent / f"{video_path.stem}{self.filename_suffix}{video_path.suffix}"
             
-            # Check for ffmpeg availability for audio processing
+            # Check for ffmpeg availability for pipe-based video I/O and audio processing
             ffmpeg_available = self.check_ffmpeg_available()
+            use_ffmpeg_io = ffmpeg_available and self.video_io == 'ffmpeg'
+            keep_audio = ffmpeg_available and actual_keep_audio
             
-            # Try to extract audio if ffmpeg is available and user wants to keep audio
-            if ffmpeg_available and actual_keep_audio:
-                audio_path = Path(tempfile.mktemp(suffix='.aac'))
-                print(f"  Extracting audio...")
-                has_audio = self.extract_audio(video_path, audio_path)
-                if has_audio:
-                    print(f"  ✓ Audio extracted successfully")
-                else:
-                    print(f"  ℹ No audio track found or unable to extract")
+            if keep_audio:
+                print(f"  ℹ Audio will be copied from the source {'while encoding' if use_ffmpeg_io else 'after encoding'}")
             elif not actual_keep_audio:
                 if self.frame_interval > 1:
                     print(f"  ℹ Audio automatically dropped due to frame skipping")
@@ -876,161 +2576,746 @@ class HumanBlurProcessor:
                 print(f"  ⚠ ffmpeg not available - audio will not be preserved")
                 print(f"  ℹ Install ffmpeg to enable audio preservation")
             
-            # Create temporary video path for processing (without audio)
-            if has_audio:
-                temp_video_path = Path(tempfile.mktemp(suffix=video_path.suffix))
-                video_writer_path = temp_video_path
+            if use_ffmpeg_io:
+                # Decode and encode through ffmpeg pipes, muxing the source audio in the same pass
+                cap.release()
+                cap = FFmpegVideoReader(video_path, width, height, fps, total_frames, self.frame_interval)
+                out = FFmpegVideoWriter(output_path, width, height, output_fps, self.video_codec, self.video_preset, self.video_crf,
+                                        audio_source=video_path if keep_audio else None)
+                if width % 2 or height % 2:
+                    print(f"  ℹ Odd frame size - output cropped to {width // 2 * 2}x{height // 2 * 2} for yuv420p")
+                print(f"  Encoding with {self.video_codec} (preset: {self.video_preset or 'default'}, CRF: {self.video_crf if self.video_crf is not None else 'default'})")
             else:
-                video_writer_path = output_path
-            
-            # Define codec and create VideoWriter
-            fourcc = cv2.VideoWriter_fourcc(*'mp4v')  # Use mp4v codec
-            out = cv2.VideoWriter(str(video_writer_path), fourcc, output_fps, (width, height))
+                if self.video_io == 'ffmpeg':
+                    print(f"  ℹ ffmpeg not available - using OpenCV video I/O (mp4v)")
+                # OpenCV writes the video only, the source audio is muxed in afterwards
+                if keep_audio:
+                    fd, temp_name = tempfile.mkstemp(suffix=video_path.suffix, prefix=f".{output_path.stem}-", dir=output_path.parent)
+                    os.close(fd)
+                    temp_video_path = Path(temp_name)
+                
+                # Define codec and create VideoWriter
+                fourcc = cv2.VideoWriter_fourcc(*'mp4v')  # Use mp4v codec
+                out = cv2.VideoWriter(str(temp_video_path or output_path), fourcc, output_fps, (width, height))
             
             if not out.isOpened():
-                print(f"  ✗ Error: Could not create video writer")
-                cap.release()
+                print(f"  ✗ Error: Could not create video writer{': ' + out.error if getattr(out, 'error', None) else ''}")
                 return False
             
             print(f"  Processing video frames...")
             
-            frame_count = 0
-            processed_count = 0
-            frames_written = 0
+            self.video_stats = {
+                'frames_read': 0,
+                'frames_inferred': 0,
+                'inferences_skipped': 0,
+                'scene_cuts': 0,
+                'frames_with_humans': 0,
+                'frames_written': 0,
+            }
+            self._propagation = None
+            if self._scheduler is not None:
+                self._scheduler.reset()
+            
+            # Frame and blur buffers are reused across frames of this video
+            self._buffer_pool = FrameBufferPool()
+            try:
+                if self.threaded_pipeline:
+                    self._run_threaded_video_loop(cap, out, confidence, fps, total_frames)
+                else:
+                    self._run_video_loop(cap, out, confidence, fps, total_frames)
+            finally:
+                self.video_stats['buffer_allocations'] = self._buffer_pool.allocations
+                self._buffer_pool = None
+            
+            frame_count = self.video_stats['frames_read']
+            processed_count = self.video_stats['frames_with_humans']
+            frames_written = self.video_stats['frames_written']
+            
+            # Release resources
+            cap.release()
+            written = out.release()  # cv2.VideoWriter returns None, FFmpegVideoWriter whether ffmpeg succeeded
+            if use_ffmpeg_io and not written:
+                print(f"\n  ✗ Error: ffmpeg could not encode the video: {out.error}")
+                return False
+            
+            if self.frame_interval > 1:
+                print(f"\n  ✓ Processed {frames_written}/{frame_count} frames ({processed_count} frames with humans detected)")
+                print(f"  ℹ Skipped {frame_count - frames_written} frames due to frame interval setting")
+            else:
+                print(f"\n  ✓ Processed {frame_count} frames ({processed_count} frames with humans detected)")
+            
+            if self.video_stats['inferences_skipped']:
+                print(f"  ℹ Ran human detection on {self.video_stats['frames_inferred']}/{frames_written} frames, masks propagated to the rest")
+            if self._scheduler is not None:
+                print(f"  ℹ Detection scheduler: {self.video_stats['inferences_skipped']} inference(s) skipped, {self.video_stats['scene_cuts']} scene cut(s)")
+            
+            if self.threaded_pipeline:
+                peak_depths = ", ".join(f"{name} {depth}/{self.pipeline_queue_size}" for name, depth in self.video_stats['queue_peak_depths'].items())
+                print(f"  ℹ Pipeline queue peak depths: {peak_depths}")
+            
+            # Merge the source audio into the OpenCV output
+            if temp_video_path is not None:
+                print(f"  Merging audio back into video...")
+                if self.merge_audio(temp_video_path, video_path, output_path):
+                    print(f"  ✓ Audio merged successfully")
+                else:
+                    print(f"  ⚠ Failed to merge audio, saving video without audio")
+                    # If merge failed, use the video without audio
+                    temp_video_path.replace(output_path)
+            
+            # Save object detections to JSON if enabled
+            if self.enable_object_detection and self.all_detections:
+                json_path = video_path.parent / f"{video_path.stem}-detections.json"
+                if self.save_detections_to_json(json_path, video_path):
+                    print(f"  ✓ Saved {len(self.all_detections)} detection(s) to {json_path.name}")
+            
+            # Calculate and display processing time
+            processing_time = time.time() - start_time
+            avg_per_frame = processing_time / frame_count if frame_count > 0 else 0
+            print(f"  Processing time: {processing_time:.2f} seconds (avg {avg_per_frame:.2f} sec/frame)")
+            print(f"  ✓ Saved to {output_path.name}")
+            return True
+            
+        except Exception as e:
+            print(f"  ✗ Error processing video {video_path}: {e}")
+            import traceback
+            traceback.print_exc()
+            return False
+        
+        finally:
+            # Release resources (again) and clean up temp files, also on error
+            if cap is not None:
+                cap.release()
+            if out is not None:
+                out.release()
+            if temp_video_path is not None and temp_video_path.exists():
+                temp_video_path.unlink()
+    
+    def _read_video_frames(self, cap: cv2.VideoCapture, total_frames: int) -> Iterator[Tuple[int, np.ndarray]]:
+        """
+        Read frames from an open video, reporting progress and applying the frame interval.
+        
+        Args:
+            cap: Opened video capture (cv2.VideoCapture or FFmpegVideoReader)
+            total_frames: Total number of frames in the video (for progress reporting)
+            
+        Yields:
+            (frame_number, frame) tuples for frames that should be processed (frame_number is 1-indexed)
+        """
+        frame_shape = (int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)), int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), 3)
+        # FFmpegVideoReader drops skipped frames itself and reports the source frame number of each frame read
+        preselected = isinstance(cap, FFmpegVideoReader) and cap.frame_interval == self.frame_interval
+        
+        while True:
+            frame_count = self.video_stats['frames_read'] + 1
+            # Skip frames based on interval (process frames 1, 1+interval, 1+2*interval, etc.)
+            skipped = not preselected and (frame_count - 1) % self.frame_interval != 0
+            
+            if skipped:
+                # Only grab skipped frames: decoded as far as the codec needs, never converted to BGR or copied
+                if not cap.grab():
+                    break
+                frame = None
+            else:
+                # Decode into a pooled buffer
+                frame_buffer = None
+                if self._buffer_pool is not None:
+                    frame_buffer = self._buffer_pool.get('decoded', frame_shape, slots=self._frames_in_flight())
+                ret, frame = cap.read(frame_buffer)
+                if not ret:
+                    if preselected and cap.frame_number > self.video_stats['frames_read']:
+                        # Account for the skipped frames after the last one read
+                        self._report_frames_read(cap.frame_number, total_frames)
+                    break
+                if preselected:
+                    frame_count = cap.frame_number
+            
+            self._report_frames_read(frame_count, total_frames)
+            
+            if not skipped:
+                yield frame_count, frame
+    
+    def _report_frames_read(self, frame_count: int, total_frames: int):
+        """
+        Record how many frames of the video have been read and report progress.
+        
+        Args:
+            frame_count: Frames read so far, including skipped frames
+            total_frames: Total number of frames in the video
+        """
+        previous_count = self.video_stats['frames_read']
+        self.video_stats['frames_read'] = frame_count
+        
+        # Call progress callback if provided
+        if self.progress_callback:
+            self.progress_callback(frame_count, total_frames)
+        
+        # Show progress every 10 frames or at the end
+        if frame_count // 10 != previous_count // 10 or frame_count == total_frames:
+            print(f"  Processing frame {frame_count}/{total_frames} ({frame_count*100//total_frames}%)", end='\r')
+    
+    def _frames_in_flight(self) -> int:
+        """
+        Upper bound on decoded frames alive at once, which sizes the decode buffer ring.
+        
+        Returns:
+            The batch being processed (plus the frame being read) for the sequential loop; for the
+            threaded pipeline also every queue and the frame held by each stage
+        """
+        if self.threaded_pipeline:
+            return 3 * self.pipeline_queue_size + self.batch_size + 3
+        return self.batch_size + 1
+    
+    def _batch_frames(self, frames: Iterator[Tuple[int, np.ndarray]]) -> Iterator[List[Tuple[int, np.ndarray]]]:
+        """
+        Group (frame_number, frame) tuples into lists of up to batch_size frames.
+        
+        Args:
+            frames: Iterator of (frame_number, frame) tuples
+            
+        Yields:
+            Lists of (frame_number, frame) tuples, the last one may be shorter
+        """
+        batch = []
+        for item in frames:
+            batch.append(item)
+            if len(batch) >= self.batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+    
+    def _mask_video_frame(self, frame: np.ndarray, detections: List[Tuple[np.ndarray, Optional[CropMask]]]) -> np.ndarray:
+        """
+        Return the frame to write for a processed video frame, updating the frame counters.
+        
+        Args:
+            frame: Decoded video frame
+            detections: List of (bounding_box, segmentation_mask) tuples for this frame
+            
+        Returns:
+            Masked frame, or the original frame if no humans were detected
+        """
+        if not detections:
+            # No humans detected, write original frame
+            return frame
+        
+        self.video_stats['frames_with_humans'] += 1
+        # Decoded frames belong to the video loop, so they are masked in place
+        return self._render_frame(frame, detections, dst=frame)
+    
+    def _run_video_loop(self, cap: cv2.VideoCapture, out: cv2.VideoWriter, confidence: float, fps: float, total_frames: int):
+        """
+        Decode, detect, mask and encode video frames sequentially on the calling thread.
+        
+        Args:
+            cap: Opened video capture (cv2.VideoCapture or FFmpegVideoReader)
+            out: Opened video writer (cv2.VideoWriter or FFmpegVideoWriter)
+            confidence: Detection confidence threshold
+            fps: Frames per second of the source video
+            total_frames: Total number of frames in the video
+        """
+        for batch in self._batch_frames(self._read_video_frames(cap, total_frames)):
+            for _, frame, detections in self._infer_frame_batch(batch, confidence, fps):
+                out.write(self._mask_video_frame(frame, detections))
+                self.video_stats['frames_written'] += 1
+    
+    def get_pipeline_queue_depths(self) -> Dict[str, int]:
+        """
+        Get the current number of frames buffered between threaded pipeline stages.
+        
+        Returns:
+            Dictionary mapping queue name ('decoded', 'inferred', 'masked') to its current depth,
+            empty when no threaded video is being processed
+        """
+        return {name: q.qsize() for name, q in self._pipeline_queues.items()}
+    
+    def _pipeline_put(self, name: str, item: Any, stop_event: threading.Event) -> bool:
+        """
+        Put an item on a pipeline queue, giving up if the pipeline is being stopped.
+        
+        Returns:
+            True if the item was queued, False if the pipeline stopped first
+        """
+        pipeline_queue = self._pipeline_queues[name]
+        while not stop_event.is_set():
+            try:
+                pipeline_queue.put(item, timeout=0.1)
+            except queue.Full:
+                continue
+            peak_depths = self.video_stats['queue_peak_depths']
+            peak_depths[name] = max(peak_depths[name], pipeline_queue.qsize())
+            return True
+        return False
+    
+    def _pipeline_items(self, name: str, stop_event: threading.Event) -> Iterator[Any]:
+        """
+        Yield items from a pipeline queue until the end-of-stream marker (None) or a stop.
+        """
+        pipeline_queue = self._pipeline_queues[name]
+        while not stop_event.is_set():
+            try:
+                item = pipeline_queue.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            if item is None:
+                return
+            yield item
+    
+    def _run_threaded_video_loop(self, cap: cv2.VideoCapture, out: cv2.VideoWriter, confidence: float, fps: float, total_frames: int):
+        """
+        Decode, detect, mask and encode video frames on four threads connected by bounded queues.
+        
+        Each stage is a single thread consuming a FIFO queue, so frame order is preserved.
+        Video decode/encode (OpenCV or ffmpeg pipes) and torch inference release the GIL, which lets the stages overlap.
+        
+        Args:
+            cap: Opened video capture (cv2.VideoCapture or FFmpegVideoReader)
+            out: Opened video writer (cv2.VideoWriter or FFmpegVideoWriter)
+            confidence: Detection confidence threshold
+            fps: Frames per second of the source video
+            total_frames: Total number of frames in the video
+        """
+        queue_names = ['decoded', 'inferred', 'masked']
+        self._pipeline_queues = {name: queue.Queue(maxsize=self.pipeline_queue_size) for name in queue_names}
+        self.video_stats['queue_peak_depths'] = {name: 0 for name in queue_names}
+        stop_event = threading.Event()
+        errors = []
+        
+        def reader():
+            for item in self._read_video_frames(cap, total_frames):
+                if not self._pipeline_put('decoded', item, stop_event):
+                    return
+            self._pipeline_put('decoded', None, stop_event)
+        
+        def inference():
+            for batch in self._batch_frames(self._pipeline_items('decoded', stop_event)):
+                for _, frame, detections in self._infer_frame_batch(batch, confidence, fps):
+                    if not self._pipeline_put('inferred', (frame, detections), stop_event):
+                        return
+            self._pipeline_put('inferred', None, stop_event)
+        
+        def masking():
+            for frame, detections in self._pipeline_items('inferred', stop_event):
+                if not self._pipeline_put('masked', self._mask_video_frame(frame, detections), stop_event):
+                    return
+            self._pipeline_put('masked', None, stop_event)
+        
+        def writer():
+            for frame in self._pipeline_items('masked', stop_event):
+                out.write(frame)
+                self.video_stats['frames_written'] += 1
+        
+        def run_stage(stage):
+            try:
+                stage()
+            except Exception as e:
+                errors.append(e)
+                stop_event.set()
+        
+        threads = [threading.Thread(target=run_stage, args=(stage,), name=f"pyxelnyx-{stage.__name__}", daemon=True)
+                   for stage in (reader, inference, masking, writer)]
+        try:
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            stop_event.set()
+            self._pipeline_queues = {}
+        
+        if errors:
+            raise errors[0]
+    
+    def _infer_frame_batch(self, batch: List[Tuple[int, np.ndarray]], confidence: float, fps: float) -> List[Tuple[int, np.ndarray, List[Tuple[np.ndarray, Optional[CropMask]]]]]:
+        """
+        Run human segmentation (and object detection if enabled) on a batch of video frames.
+        
+        Args:
+            batch: List of (frame_number, frame) tuples, frame_number is 1-indexed
+            confidence: Detection confidence threshold
+            fps: Frames per second of the source video (for detection timestamps)
+            
+        Returns:
+            List of (frame_number, frame, detections) tuples in the same order as the batch
+        """
+        if self._scheduler is not None:
+            return self._infer_scheduled_frames(batch, confidence, fps)
+        
+        # Only detection frames go through the models, the others get the propagated detections
+        detection_frames = [(frame_number, frame) for frame_number, frame in batch if self._is_detection_frame(frame_number)]
+        
+        # Detect humans with segmentation masks (one model call for the whole batch)
+        batch_detections = self.detect_humans_with_masks_batch([frame for _, frame in detection_frames], confidence)
+        self.video_stats['frames_inferred'] += len(detection_frames)
+        self.video_stats['inferences_skipped'] += len(batch) - len(detection_frames)
+        
+        # Detect background objects (excluding humans) if enabled
+        for frame_number, frame in detection_frames:
+            self._detect_video_frame_objects(frame_number, frame, confidence, fps)
+        
+        if self.detection_interval == 1:
+            return [(frame_number, frame, detections) for (frame_number, frame), detections in zip(batch, batch_detections)]
+        
+        fresh_detections = iter(batch_detections)
+        results = []
+        for frame_number, frame in batch:
+            detections = next(fresh_detections) if self._is_detection_frame(frame_number) else None
+            results.append((frame_number, frame, self._propagate_detections(frame, detections)))
+        return results
+    
+    def _infer_scheduled_frames(self, batch: List[Tuple[int, np.ndarray]], confidence: float, fps: float) -> List[Tuple[int, np.ndarray, List[Tuple[np.ndarray, Optional[CropMask]]]]]:
+        """
+        Run detection on the frames of a batch the detection scheduler picks, propagating detections to the others.
+        
+        Frames are detected one at a time, since each decision depends on the detections of the frame before.
+        
+        Args:
+            batch: List of (frame_number, frame) tuples, frame_number is 1-indexed
+            confidence: Detection confidence threshold
+            fps: Frames per second of the source video (for detection timestamps)
+            
+        Returns:
+            List of (frame_number, frame, detections) tuples in the same order as the batch
+        """
+        results = []
+        for frame_number, frame in batch:
+            flow_frame = self._flow_frame(frame)
+            
+            # Current detection boxes in flow frame pixels
+            scale = flow_frame.shape[1] / frame.shape[1]
+            previous_detections = self._propagation['detections'] if self._propagation else []
+            boxes = [tuple(int(round(value * scale)) for value in bbox[:4]) for bbox, _ in previous_detections]
+            
+            reason = self._scheduler.should_detect(flow_frame, boxes)
+            detections = None
+            if reason is not None:
+                detections = self.detect_humans_with_masks_batch([frame], confidence)[0]
+                self._detect_video_frame_objects(frame_number, frame, confidence, fps)
+                self.video_stats['frames_inferred'] += 1
+                self.video_stats['scene_cuts'] += reason == 'scene_cut'
+            else:
+                self.video_stats['inferences_skipped'] += 1
+            
+            results.append((frame_number, frame, self._propagate_detections(frame, detections, flow_frame)))
+        return results
+    
+    def _detect_video_frame_objects(self, frame_number: int, frame: np.ndarray, confidence: float, fps: float):
+        """Detect background objects on a video frame if enabled, collecting them for the detections JSON."""
+        if not self.enable_object_detection:
+            return
+        timestamp = self.format_timestamp(frame_number - 1, fps)  # frame_number is 1-indexed
+        object_detections = self.detect_background_objects(
+            frame, 
+            confidence, 
+            frame_number=frame_number,
+            timestamp=timestamp
+        )
+        self.all_detections.extend(object_detections)
+    
+    def _is_detection_frame(self, frame_number: int) -> bool:
+        """Whether humans are detected on this video frame (every detection_interval-th processed frame, starting with the first)."""
+        return ((frame_number - 1) // self.frame_interval) % self.detection_interval == 0
+    
+    def _propagate_detections(self, frame: np.ndarray, detections: Optional[List[Tuple[np.ndarray, Optional[CropMask]]]] = None, flow_frame: Optional[np.ndarray] = None) -> List[Tuple[np.ndarray, Optional[CropMask]]]:
+        """
+        Carry the detections of the last detection frame forward to the next video frame.
+        
+        Frames must be passed in order. With 'flow' propagation boxes and masks follow the
+        dense optical flow from the previous frame; with 'hold' they are reused unchanged.
+        
+        Args:
+            frame: Video frame
+            detections: Fresh detections if this is a detection frame, None to propagate the previous ones
+            flow_frame: The frame's flow frame if already computed (see _flow_frame)
+            
+        Returns:
+            List of (bounding_box, segmentation_mask) tuples for this frame
+        """
+        if flow_frame is None and self.mask_propagation == 'flow':
+            flow_frame = self._flow_frame(frame)
+        
+        if detections is None:
+            previous = self._propagation or {'detections': [], 'flow_frame': None}
+            detections = previous['detections']
+            if detections and self.mask_propagation == 'flow' and previous['flow_frame'] is not None:
+                # Flow from this frame back to the previous one: this(p) ~ previous(p + flow(p))
+                flow = cv2.calcOpticalFlowFarneback(flow_frame, previous['flow_frame'], None, 0.5, 3, 15, 3, 5, 1.2, 0)
+                detections = self._warp_detections(detections, flow, frame.shape)
+        
+        self._propagation = {'detections': detections, 'flow_frame': flow_frame}
+        return detections
+    
+    def _flow_frame(self, frame: np.ndarray) -> np.ndarray:
+        """Downscale a video frame to the grayscale image optical flow is computed on."""
+        height, width = frame.shape[:2]
+        scale = min(1.0, self.MASK_FLOW_SIZE / max(height, width))
+        small = cv2.resize(frame, (max(1, round(width * scale)), max(1, round(height * scale))), interpolation=cv2.INTER_AREA)
+        return cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+    
+    def _warp_detections(self, detections: List[Tuple[np.ndarray, Optional[CropMask]]], flow: np.ndarray, image_shape: Tuple[int, ...]) -> List[Tuple[np.ndarray, Optional[CropMask]]]:
+        """
+        Move detections from the previous frame to the current one along a backward optical flow field.
+        
+        Args:
+            detections: List of (bounding_box, segmentation_mask) tuples of the previous frame
+            flow: (h, w, 2) flow from the current frame to the previous one, at flow frame resolution
+            image_shape: Shape of the video frame
+            
+        Returns:
+            Warped list of (bounding_box, segmentation_mask) tuples
+        """
+        flow_h, flow_w = flow.shape[:2]
+        scale_x, scale_y = flow_w / image_shape[1], flow_h / image_shape[0]
+        mask_flows = {}  # Flow resized to each mask resolution, in mask pixels
+        
+        warped = []
+        for bbox, mask in detections:
+            # Boxes move by the median flow inside them
+            x1 = int(np.clip(bbox[0] * scale_x, 0, flow_w - 1))
+            y1 = int(np.clip(bbox[1] * scale_y, 0, flow_h - 1))
+            x2 = max(x1 + 1, int(np.ceil(min(bbox[2] * scale_x, flow_w))))
+            y2 = max(y1 + 1, int(np.ceil(min(bbox[3] * scale_y, flow_h))))
+            dx, dy = np.median(flow[y1:y2, x1:x2].reshape(-1, 2), axis=0)
+            bbox = bbox - np.array([dx / scale_x, dy / scale_y] * 2, dtype=bbox.dtype)
+            
+            if mask is not None and mask.data.size:
+                if mask.shape not in mask_flows:
+                    mask_h, mask_w = mask.shape
+                    mask_flows[mask.shape] = cv2.resize(flow, (mask_w, mask_h), interpolation=cv2.INTER_LINEAR) * np.float32([mask_w / flow_w, mask_h / flow_h])
+                mask = self._warp_mask(mask, mask_flows[mask.shape])
+            warped.append((bbox, mask))
+        return warped
+    
+    def _warp_mask(self, mask: CropMask, flow: np.ndarray) -> CropMask:
+        """
+        Warp a mask along a backward flow field at mask resolution, working only on its padded crop.
+        
+        Args:
+            mask: Mask of the previous frame
+            flow: (h, w, 2) flow from the current frame to the previous one, covering the full mask
+            
+        Returns:
+            Warped CropMask, cropped to its new bounding box
+        """
+        # Grow the crop by the largest displacement inside it so the warped mask is not clipped
+        x1, y1, x2, y2 = mask.bbox
+        reach = int(np.ceil(np.abs(flow[y1:y2, x1:x2]).max())) + 1
+        x1, y1, x2, y2 = mask.padded_bbox(reach)
+        
+        map_x = flow[y1:y2, x1:x2, 0] + np.arange(x1 - mask.x, x2 - mask.x, dtype=np.float32)
+        map_y = flow[y1:y2, x1:x2, 1] + np.arange(y1 - mask.y, y2 - mask.y, dtype=np.float32)[:, None]
+        warped = cv2.remap(mask.data, map_x, map_y, cv2.INTER_NEAREST, borderMode=cv2.BORDER_CONSTANT, borderValue=0)
+        
+        x, y, w, h = cv2.boundingRect(warped)
+        return CropMask(warped[y:y + h, x:x + w].copy(), x1 + x, y1 + y, mask.shape)
+    
+    def _render_frame(self, frame: np.ndarray, detections: List[Tuple[np.ndarray, Optional[CropMask]]], dst: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Apply the configured mask (blur or black) to all detected humans in a video frame.
+        
+        Args:
+            frame: Input video frame
+            detections: List of (bounding_box, segmentation_mask) tuples for this frame
+            dst: Output frame, may be frame itself to render in place (default: a new copy)
+            
+        Returns:
+            Masked frame
+        """
+        # Separate detections into those with masks and those without
+        detections_with_masks = [(bbox, mask) for bbox, mask in detections if mask is not None and self.use_segmentation]
+        detections_without_masks = [(bbox, mask) for bbox, mask in detections if mask is None or not self.use_segmentation]
+        
+        result = self._output_image(frame, dst)
+        
+        # Apply unified mask for all detections with masks
+        if detections_with_masks:
+            masks_only = [mask for _, mask in detections_with_masks]
+            combined_mask = self.combine_masks(masks_only, frame.shape)
             
-            while True:
-                ret, frame = cap.read()
-                if not ret:
-                    break
-                
-                frame_count += 1
+            if combined_mask is not None:
+                # Detect skin tones in expanded regions if enabled
+                if self.enable_skin_detection:
+                    combined_mask = self.add_skin_tones(frame, combined_mask)
                 
-                # Call progress callback if provided
-                if self.progress_callback:
-                    self.progress_callback(frame_count, total_frames)
-                
-                # Show progress every 10 frames or at the end
-                if frame_count % 10 == 0 or frame_count == total_frames:
-                    print(f"  Processing frame {frame_count}/{total_frames} ({frame_count*100//total_frames}%)", end='\r')
-                
-                # Skip frames based on interval (process frames 1, 1+interval, 1+2*interval, etc.)
-                if (frame_count - 1) % self.frame_interval != 0:
-                    continue
-                
-                # Detect humans with segmentation masks
-                detections = self.detect_humans_with_masks(frame, confidence)
-                
-                # Detect background objects (excluding humans) if enabled
-                if self.enable_object_detection:
-                    timestamp = self.format_timestamp(frame_count - 1, fps)  # frame_count is 1-indexed
-                    object_detections = self.detect_background_objects(
-                        frame, 
-                        confidence, 
-                        frame_number=frame_count,
-                        timestamp=timestamp
-                    )
-                    self.all_detections.extend(object_detections)
-                
-                if detections:
-                    processed_count += 1
-                    
-                    # Separate detections into those with masks and those without
-                    detections_with_masks = [(bbox, mask) for bbox, mask in detections if mask is not None and self.use_segmentation]
-                    detections_without_masks = [(bbox, mask) for bbox, mask in detections if mask is None or not self.use_segmentation]
-                    
-                    result = frame.copy()
-                    
-                    # Apply unified mask for all detections with masks
-                    if detections_with_masks:
-                        masks_only = [mask for _, mask in detections_with_masks]
-                        combined_mask = self.combine_masks(masks_only)
-                        
-                        if combined_mask is not None:
-                            # Update temporal tracking with skin tone samples from YOLO detections
-                            if self.enable_skin_detection:
-                                self.update_skin_tone_samples(frame, combined_mask)
-                            
-                            # Detect skin tones in expanded regions if enabled
-                            if self.enable_skin_detection:
-                                # Create expanded search region
-                                search_region = self.create_expanded_search_region(combined_mask, expansion_pixels=75)
-                                # Detect skin tones within the search region
-                                skin_mask = self.detect_skin_tones_ycrcb(frame, search_mask=search_region)
-                                # Combine YOLO mask with skin tone mask
-                                combined_mask = self.combine_yolo_and_skin_masks(combined_mask, skin_mask)
-                            
-                            if self.mask_type == 'blur':
-                                result = self.blur_with_mask(result, combined_mask, None)
-                            else:  # black mask
-                                result = self.black_mask_with_mask(result, combined_mask, None)
-                    
-                    # Apply box mask for any detections without masks (fallback)
-                    if detections_without_masks:
-                        for bbox, _ in detections_without_masks:
-                            if self.mask_type == 'blur':
-                                result = self.blur_with_box(result, bbox)
-                            else:  # black mask
-                                result = self.black_mask_with_box(result, bbox)
-                    
-                    out.write(result)
-                    frames_written += 1
-                else:
-                    # No humans detected, write original frame
-                    out.write(frame)
-                    frames_written += 1
+                if self.mask_type == 'blur':
+                    result = self.blur_with_mask(result, combined_mask, None, dst=result)
+                else:  # black mask
+                    result = self.black_mask_with_mask(result, combined_mask, None, dst=result)
+        
+        # Apply box mask for any detections without masks (fallback)
+        if detections_without_masks:
+            for bbox, _ in detections_without_masks:
+                if self.mask_type == 'blur':
+                    result = self.blur_with_box(result, bbox, dst=result)
+                else:  # black mask
+                    result = self.black_mask_with_box(result, bbox, dst=result)
+        
+        return result
+    
+    def _process_image_batch(self, image_paths: List[Path], confidence: float, start_index: int, total_files: int) -> int:
+        """
+        Process images in chunks of batch_size, running one segmentation call per group of
+        same-sized images. Output files and detection JSON are identical to process_image.
+        
+        Args:
+            image_paths: Images to process, in order
+            confidence: Detection confidence threshold
+            start_index: Number of files already processed (for progress messages)
+            total_files: Total number of files in the run (for progress messages)
             
-            # Release resources
-            cap.release()
-            out.release()
+        Returns:
+            Number of images processed successfully
+        """
+        successful = 0
+        
+        for chunk_start in range(0, len(image_paths), self.batch_size):
+            chunk = image_paths[chunk_start:chunk_start + self.batch_size]
+            chunk_start_time = time.time()
             
-            if self.frame_interval > 1:
-                print(f"\n  ✓ Processed {frames_written}/{frame_count} frames ({processed_count} frames with humans detected)")
-                print(f"  ℹ Skipped {frame_count - frames_written} frames due to frame interval setting")
-            else:
-                print(f"\n  ✓ Processed {frame_count} frames ({processed_count} frames with humans detected)")
+            # Load the whole chunk (unreadable images are reported in order below)
+            loaded = [(image_path, self.load_image(image_path)) for image_path in chunk]
             
-            # Merge audio back if available
-            if has_audio and ffmpeg_available and audio_path.exists():
-                print(f"  Merging audio back into video...")
-                if self.merge_audio(temp_video_path, audio_path, output_path):
-                    print(f"  ✓ Audio merged successfully")
-                    # Clean up temp files
-                    temp_video_path.unlink()
-                else:
-                    print(f"  ⚠ Failed to merge audio, saving video without audio")
-                    # If merge failed, use the video without audio
-                    if temp_video_path.exists():
-                        temp_video_path.rename(output_path)
-                
-                # Clean up audio file
-                if audio_path.exists():
-                    audio_path.unlink()
+            # Group by image shape so every inference call sees a single input size
+            shape_groups: Dict[Tuple[int, ...], List[int]] = {}
+            for idx, (_, image) in enumerate(loaded):
+                if image is not None:
+                    shape_groups.setdefault(image.shape, []).append(idx)
             
-            # Save object detections to JSON if enabled
-            if self.enable_object_detection and self.all_detections:
-                json_path = video_path.parent / f"{video_path.stem}-detections.json"
-                if self.save_detections_to_json(json_path, video_path):
-                    print(f"  ✓ Saved {len(self.all_detections)} detection(s) to {json_path.name}")
+            detections_by_index = {}
+            for indices in shape_groups.values():
+                batch_detections = self.detect_humans_with_masks_batch([loaded[idx][1] for idx in indices], confidence)
+                detections_by_index.update(zip(indices, batch_detections))
             
-            # Calculate and display processing time
-            processing_time = time.time() - start_time
-            avg_per_frame = processing_time / frame_count if frame_count > 0 else 0
-            print(f"  Processing time: {processing_time:.2f} seconds (avg {avg_per_frame:.2f} sec/frame)")
-            print(f"  ✓ Saved to {output_path.name}")
-            return True
+            # Share of load + inference time attributed to each image in the chunk
+            shared_time = (time.time() - chunk_start_time) / len(chunk)
             
-        except Exception as e:
-            print(f"  ✗ Error processing video {video_path}: {e}")
-            import traceback
-            traceback.print_exc()
+            for idx, (image_path, image) in enumerate(loaded):
+                current = start_index + chunk_start + idx + 1
+                self.all_detections = []  # Reset detections for each file
+                self.reset_skin_tracking()  # Reset skin tone samples for each file
+                print(f"Processing [{current}/{total_files}] (Image): {image_path.name}")
+                
+                if image is None:
+                    print(f"✗ Error: Could not read image {image_path}")
+                else:
+                    try:
+                        if self._mask_and_save_image(image_path, image, detections_by_index[idx], None, confidence, time.time() - shared_time):
+                            successful += 1
+                    except Exception as e:
+                        print(f"✗ Error processing {image_path}: {e}")
+                        import traceback
+                        traceback.print_exc()
+                print()
+        
+        return successful
+    
+    def _run_worker_pool(self, worker_count: int, processor_settings: Dict[str, Any], worker_function: Callable, task_args: List[tuple], on_event: Optional[Callable[[str, Dict[str, Any]], None]] = None, on_result: Optional[Callable[[int, Any, Optional[Exception]], None]] = None, cancel_check: Optional[Callable[[], bool]] = None):
+        """
+        Run tasks on a pool of worker processes, each holding a processor built from processor_settings.
+        
+        Args:
+            worker_count: Number of worker processes
+            processor_settings: Constructor arguments for the per-worker HumanBlurProcessor
+            worker_function: Module-level function executed in the workers
+            task_args: One argument tuple per task, handed out from the pool's shared queue
+            on_event: Optional callback receiving (event, data) tuples sent by workers
+            on_result: Optional callback receiving (task_index, result, error) as tasks finish
+            cancel_check: Optional callable polled while waiting; returning True stops the pool
+        """
+        # Spawn (not fork) so every worker initializes torch cleanly
+        context = multiprocessing.get_context('spawn')
+        event_queue = context.Queue()
+        
+        def forward_events():
+            while True:
+                try:
+                    event, data = event_queue.get_nowait()
+                except queue.Empty:
+                    return
+                if on_event:
+                    on_event(event, data)
+        
+        pool = context.Pool(worker_count, initializer=_init_worker_process, initargs=(processor_settings, worker_count, event_queue))
+        try:
+            pending = [(task_index, pool.apply_async(worker_function, args)) for task_index, args in enumerate(task_args)]
             
-            # Clean up temp files on error
-            if temp_video_path and temp_video_path.exists():
-                temp_video_path.unlink()
-            if audio_path and audio_path.exists():
-                audio_path.unlink()
+            while pending:
+                if cancel_check and cancel_check():
+                    break
+                
+                pending[0][1].wait(timeout=0.1)
+                forward_events()
+                
+                still_pending = []
+                for task_index, async_result in pending:
+                    if not async_result.ready():
+                        still_pending.append((task_index, async_result))
+                        continue
+                    try:
+                        result, error = async_result.get(), None
+                    except Exception as e:
+                        result, error = None, e
+                    if on_result:
+                        on_result(task_index, result, error)
+                pending = still_pending
+            
+            forward_events()
+        finally:
+            pool.terminate()
+            pool.join()
+    
+    def process_files_parallel(self, file_paths: List[Path], confidence: float = 0.5, event_callback: Optional[Callable[[str, Dict[str, Any]], None]] = None, cancel_check: Optional[Callable[[], bool]] = None) -> int:
+        """
+        Process media files on a pool of worker processes (self.workers), each with its own model.
+        
+        Files are handed out one at a time from a shared work queue. Progress is reported back to
+        this process through event_callback(event, data) with the events:
+            - 'file_start': {'file', 'index'} when a worker picks up a file
+            - 'progress': {'file', 'current', 'total'} for video frame progress
+            - 'file_complete': {'file', 'success', 'completed'} when a worker finishes a file
+        
+        Args:
+            file_paths: Image and video files to process
+            confidence: Detection confidence threshold
+            event_callback: Optional callback receiving (event, data) progress events
+            cancel_check: Optional callable polled while waiting; returning True stops the pool
             
-            return False
+        Returns:
+            Number of files processed successfully
+        """
+        counts = {'started': 0, 'completed': 0, 'successful': 0}
+        
+        def on_event(event: str, data: Dict[str, Any]):
+            if event == 'file_start':
+                counts['started'] += 1
+                data['index'] = counts['started']
+            if event_callback:
+                event_callback(event, data)
+        
+        def on_result(task_index: int, result: Optional[Tuple[str, bool]], error: Optional[Exception]):
+            file_path = file_paths[task_index]
+            if error is not None:
+                print(f"✗ Error processing {file_path}: {error}")
+            success = error is None and result[1]
+            counts['completed'] += 1
+            if success:
+                counts['successful'] += 1
+            if event_callback:
+                event_callback('file_complete', {'file': file_path.name, 'success': success, 'completed': counts['completed']})
+        
+        self._run_worker_pool(
+            min(self.workers, len(file_paths)),
+            # Videos are not split further inside the pool (worker processes cannot start pools)
+            dict(self.processor_settings, video_segments=1),
+            _process_file_in_worker,
+            [(str(file_path), confidence) for file_path in file_paths],
+            on_event=on_event,
+            on_result=on_result,
+            cancel_check=cancel_check,
+        )
+        
+        return counts['successful']
     
     def process_directory(self, directory_path: Path, confidence: float = 0.5, media_type: str = 'both') -> Tuple[int, int]:
         """
@@ -1078,30 +3363,199 @@ class HumanBlurProcessor:
         else:
             print(f"\nFound {len(video_files)} video(s) to process\n")
         
+        if self.workers > 1 and total_files > 1:
+            # Each worker process loads its own model and pulls files from a shared queue
+            def report(event: str, data: Dict[str, Any]):
+                if event == 'file_start':
+                    print(f"Processing [{data['index']}/{total_files}]: {data['file']}")
+                elif event == 'file_complete':
+                    status = "✓" if data['success'] else "✗"
+                    print(f"  {status} Finished {data['file']} ({data['completed']}/{total_files} done)")
+            
+            successful = self.process_files_parallel(image_files + video_files, confidence=confidence, event_callback=report)
+            return successful, total_files
+        
         successful = 0
         current = 0
         
         # Process images first
-        for image_path in image_files:
-            current += 1
-            self.all_detections = []  # Reset detections for each file
-            self.skin_tone_samples = []  # Reset skin tone samples for each file
-            print(f"Processing [{current}/{total_files}] (Image): {image_path.name}")
-            if self.process_image(image_path, confidence=confidence):
-                successful += 1
-            print()
+        if self.batch_size > 1 and image_files:
+            # Batched inference: several same-sized images per model call
+            successful += self._process_image_batch(image_files, confidence, current, total_files)
+            current += len(image_files)
+        else:
+            for image_path in image_files:
+                current += 1
+                self.all_detections = []  # Reset detections for each file
+                self.reset_skin_tracking()  # Reset skin tone samples for each file
+                print(f"Processing [{current}/{total_files}] (Image): {image_path.name}")
+                if self.process_image(image_path, confidence=confidence):
+                    successful += 1
+                print()
         
         # Process videos
         for video_path in video_files:
             current += 1
             self.all_detections = []  # Reset detections for each file
-            self.skin_tone_samples = []  # Reset skin tone samples for each file
+            self.reset_skin_tracking()  # Reset skin tone samples for each file
             print(f"Processing [{current}/{total_files}] (Video): {video_path.name}")
             if self.process_video(video_path, confidence=confidence):
                 successful += 1
             print()
         
         return successful, total_files
+    
+    def calibrate_int8(self, samples_dir: Path, confidence: float = 0.5, max_samples: int = 100) -> Optional[Dict[str, Any]]:
+        """
+        Build the INT8 segmentation model from a folder of sample images, then compare it
+        with the FP32 model on the same images.
+        
+        Args:
+            samples_dir: Folder of representative images (searched recursively)
+            confidence: Confidence threshold used for the accuracy comparison
+            max_samples: Maximum number of sample images to use
+            
+        Returns:
+            Report dict (samples, fp32_ms, int8_ms, speedup, mean_iou, min_iou, model_path) or None if failed
+        """
+        if self.inference_engine not in ('onnx', 'openvino') or self.precision != 'fp32':
+            print("✗ Error: Calibration requires the onnx or openvino engine with an FP32 model")
+            return None
+        
+        sample_paths = sorted(f for f in samples_dir.rglob('*') if f.is_file() and f.suffix.lower() in self.SUPPORTED_IMAGE_FORMATS)[:max_samples]
+        images = [image for image in (self.load_image(path) for path in sample_paths) if image is not None]
+        if not images:
+            print(f"✗ Error: No sample images found in {samples_dir}")
+            return None
+        
+        print(f"Calibrating INT8 model on {len(images)} sample image(s)...")
+        # Full-size letterboxed inputs, preprocessed by the engine exactly like inference
+        calibration_blobs = [self.model.preprocess([image])[0][0] for image in images]
+        
+        try:
+            model_path = quantize_model(self.model_name, self.inference_engine, calibration_blobs)
+            int8_model = load_inference_engine(self.model_name, self.inference_engine, self.inference_threads, 'int8')
+        except Exception as e:
+            print(f"✗ Error building INT8 model: {e}")
+            return None
+        print(f"✓ INT8 model saved to {model_path}")
+        
+        def human_mask(model, image: np.ndarray) -> np.ndarray:
+            prediction = model.predict([image], confidence, classes=[0])[0]
+            detections = self._extract_human_detections(prediction)
+            combined = self.combine_masks([detection_mask for _, detection_mask in detections if detection_mask is not None], image.shape)
+            mask = combined.to_array() if combined is not None else np.zeros(image.shape[:2], dtype=np.uint8)
+            for bbox, detection_mask in detections:
+                if detection_mask is None:
+                    x1, y1, x2, y2 = map(int, bbox)
+                    mask[y1:y2, x1:x2] = 1
+            return mask
+        
+        # Warm up both models so one-time allocation does not skew timings
+        human_mask(self.model, images[0])
+        human_mask(int8_model, images[0])
+        
+        fp32_seconds, int8_seconds, ious = 0.0, 0.0, []
+        for image in images:
+            start = time.time()
+            fp32_mask = human_mask(self.model, image)
+            fp32_seconds += time.time() - start
+            
+            start = time.time()
+            int8_mask = human_mask(int8_model, image)
+            int8_seconds += time.time() - start
+            
+            union = np.count_nonzero(fp32_mask | int8_mask)
+            ious.append(np.count_nonzero(fp32_mask & int8_mask) / union if union else 1.0)
+        
+        report = {
+            'samples': len(images),
+            'fp32_ms': round(fp32_seconds / len(images) * 1000, 2),
+            'int8_ms': round(int8_seconds / len(images) * 1000, 2),
+            'speedup': round(fp32_seconds / int8_seconds, 2) if int8_seconds > 0 else None,
+            'mean_iou': round(float(np.mean(ious)), 4),
+            'min_iou': round(float(np.min(ious)), 4),
+            'model_path': str(model_path),
+        }
+        
+        print(f"  FP32: {report['fp32_ms']} ms/image")
+        print(f"  INT8: {report['int8_ms']} ms/image")
+        print(f"  Speedup: {report['speedup']}x")
+        print(f"  Human mask IoU vs FP32: mean {report['mean_iou']}, worst {report['min_iou']}")
+        return report
+
+
+# Per-process state for worker processes started by HumanBlurProcessor.process_files_parallel
+_worker_processor: Optional[HumanBlurProcessor] = None
+_worker_event_queue = None
+_worker_init_error: Optional[str] = None
+
+
+def _init_worker_process(processor_settings: Dict[str, Any], worker_count: int, event_queue) -> None:
+    """Load the models once per worker process and split CPU threads between workers."""
+    global _worker_processor, _worker_event_queue, _worker_init_error
+    
+    # Split CPU threads between workers unless a thread count was configured
+    settings = dict(processor_settings)
+    if not settings.get('inference_threads'):
+        settings['inference_threads'] = max(1, (os.cpu_count() or 1) // worker_count)
+    
+    _worker_event_queue = event_queue
+    try:
+        # A model_loader makes load failures raise instead of calling sys.exit
+        _worker_processor = HumanBlurProcessor(
+            **settings,
+            model_loader=lambda name, engine, precision: load_inference_engine(name, engine, settings['inference_threads'], precision),
+        )
+    except BaseException as e:
+        # A failing initializer makes the pool respawn workers forever; fail every task instead
+        _worker_init_error = str(e) or repr(e)
+
+
+def _get_worker_processor() -> HumanBlurProcessor:
+    """The processor of this worker process, raising the model load error if it could not be built."""
+    if _worker_processor is None:
+        raise RuntimeError(f"Worker process could not start: {_worker_init_error}")
+    return _worker_processor
+
+
+def _process_file_in_worker(file_path: str, confidence: float) -> Tuple[str, bool]:
+    """Process one image or video in a worker process, reporting progress to the parent."""
+    path = Path(file_path)
+    processor = _get_worker_processor()
+    
+    # Reset per-file state, as for sequential directory processing
+    processor.all_detections = []
+    processor.reset_skin_tracking()
+    processor.progress_callback = lambda current, total: _worker_event_queue.put(
+        ('progress', {'file': path.name, 'current': current, 'total': total}))
+    
+    _worker_event_queue.put(('file_start', {'file': path.name}))
+    
+    if path.suffix.lower() in processor.SUPPORTED_IMAGE_FORMATS:
+        success = processor.process_image(path, confidence=confidence)
+    else:
+        success = processor.process_video(path, confidence=confidence)
+    
+    return path.name, success
+
+
+def _process_video_segment_in_worker(segment_index: int, segment_path: str, output_path: str, confidence: float) -> Dict[str, Any]:
+    """Process one segment of a split video in a worker process, reporting frame progress to the parent."""
+    processor = _get_worker_processor()
+    
+    processor.all_detections = []
+    processor.reset_skin_tracking()
+    processor.progress_callback = lambda current, total: _worker_event_queue.put(
+        ('segment_progress', {'segment': segment_index, 'current': current}))
+    
+    success = processor.process_video(Path(segment_path), Path(output_path), confidence=confidence)
+    
+    return {
+        'success': success,
+        'video_stats': dict(processor.video_stats),
+        'detections': processor.all_detections,
+    }
 
 
 def main():
@@ -1138,6 +3592,32 @@ Examples:
   # Use a more accurate segmentation model (slower)
   %(prog)s photo.jpg --model yolov8m-seg.pt
   
+  # Run video inference on 8 frames per model call (faster on CPU)
+  %(prog)s video.mp4 --batch-size 8
+  
+  # Overlap decoding and encoding with inference on separate threads
+  %(prog)s video.mp4 --threaded-pipeline --batch-size 4
+  
+  # Process a large folder on 8 worker processes
+  %(prog)s /path/to/media/ --workers 8
+  
+  # Process one long video as 8 keyframe-aligned segments in parallel
+  %(prog)s long_video.mp4 --segments 8
+  
+  # Run inference with ONNX Runtime on CPU (model is exported to .onnx on first use)
+  %(prog)s video.mp4 --engine onnx
+  
+  # Run inference with OpenVINO on Intel CPUs (compiled model is cached for later runs)
+  %(prog)s video.mp4 --engine openvino
+  
+  # Build an INT8 model from sample images, then use it
+  %(prog)s samples/ --engine openvino --calibrate
+  %(prog)s video.mp4 --engine openvino --precision int8
+  
+  # Use the fast pyramid blur engine, and compare blur engines on a sample frame
+  %(prog)s video.mp4 --mask-type blur --blur-engine pyramid
+  %(prog)s video.mp4 --blur 151 --passes 3 --benchmark-blur
+  
   # Process HEIC images from iPhone
   %(prog)s IMG_1234.HEIC
 
@@ -1188,6 +3668,31 @@ Note: Audio preservation in videos requires ffmpeg to be installed.
         help='Number of blur passes for more intense effect (default: 3, range: 1-10) - only used with --mask-type blur'
     )
     
+    parser.add_argument(
+        '--blur-engine',
+        type=str,
+        default='gaussian',
+        choices=list(BLUR_ENGINES),
+        help='Blur implementation: gaussian (one equivalent Gaussian pass), box (three box blurs, cost independent of kernel size) '
+             'or pyramid (downscale-blur-upscale, fastest for large kernels) (default: gaussian)'
+    )
+    
+    parser.add_argument(
+        '--morphology',
+        type=str,
+        default='auto',
+        choices=list(MORPHOLOGY_MODES),
+        help='Mask dilation: auto (kernels over 31 px dilate a downscaled mask), exact (full-resolution elliptical kernel) '
+             'or rect (square kernel, fastest, slightly larger expansion) (default: auto)'
+    )
+    
+    parser.add_argument(
+        '--benchmark-blur',
+        action='store_true',
+        help='Time each blur engine on the input image (or first video frame) with the current --blur/--passes '
+             'and report PSNR against the multi-pass Gaussian blur, then exit'
+    )
+    
     parser.add_argument(
         '-c', '--confidence',
         type=float,
@@ -1199,9 +3704,32 @@ Note: Audio preservation in videos requires ffmpeg to be installed.
         '-m', '--model',
         type=str,
         default='yolov8n-seg.pt',
-        choices=['yolov8n-seg.pt', 'yolov8s-seg.pt', 'yolov8m-seg.pt', 'yolov8l-seg.pt', 'yolov8x-seg.pt',
-                 'yolov8n.pt', 'yolov8s.pt', 'yolov8m.pt', 'yolov8l.pt', 'yolov8x.pt'],
-        help='YOLO model to use (n=nano/fastest, x=extra-large/most accurate, -seg=segmentation, default: yolov8n-seg.pt)'
+        help='YOLO model to use: ' + ', '.join(MODEL_CHOICES) + ' or an exported .onnx file / OpenVINO model directory '
+             '(n=nano/fastest, x=extra-large/most accurate, -seg=segmentation, default: yolov8n-seg.pt)'
+    )
+    
+    parser.add_argument(
+        '--engine',
+        type=str,
+        default='torch',
+        choices=list(INFERENCE_ENGINES),
+        help='Inference engine: torch (PyTorch), onnx (ONNX Runtime) or openvino (OpenVINO, Intel CPUs); '
+             'onnx/openvino export the model on first use (default: torch)'
+    )
+    
+    parser.add_argument(
+        '--precision',
+        type=str,
+        default='fp32',
+        choices=list(PRECISIONS),
+        help='Segmentation model precision: fp32 or int8 (onnx/openvino engines, build the INT8 model with --calibrate first) (default: fp32)'
+    )
+    
+    parser.add_argument(
+        '--calibrate',
+        action='store_true',
+        help='Build the INT8 model for --model/--engine from the sample images in the input folder, '
+             'then report its speedup and mask IoU drift against FP32'
     )
     
     parser.add_argument(
@@ -1225,6 +3753,121 @@ Note: Audio preservation in videos requires ffmpeg to be installed.
         help='YOLO model for object detection (default: yolov8m.pt for better accuracy)'
     )
     
+    parser.add_argument(
+        '--batch-size',
+        type=int,
+        default=1,
+        help='Number of video frames or directory images per segmentation inference call; with --workers images are '
+             'processed one per call, videos still batch frames (default: 1, range: 1-64)'
+    )
+    
+    parser.add_argument(
+        '--threaded-pipeline',
+        action='store_true',
+        default=False,
+        help='Overlap video decoding, inference, masking and encoding on separate threads (default: disabled)'
+    )
+    
+    parser.add_argument(
+        '--queue-size',
+        type=int,
+        default=8,
+        help='Frames buffered between threaded pipeline stages (default: 8, range: 1-256)'
+    )
+    
+    parser.add_argument(
+        '-w', '--workers',
+        type=int,
+        default=1,
+        help='Worker processes for directory processing, each loading its own model (default: 1)'
+    )
+    
+    parser.add_argument(
+        '--segments',
+        type=int,
+        default=1,
+        help='Split each video at keyframes into N segments processed in parallel processes (default: 1, requires ffmpeg)'
+    )
+    
+    parser.add_argument(
+        '--detection-interval',
+        type=int,
+        default=1,
+        help='Detect humans on every Nth video frame and propagate the masks to the frames in between; '
+             'unlike frame skipping every frame and the audio are kept (default: 1)'
+    )
+    
+    parser.add_argument(
+        '--mask-propagation',
+        type=str,
+        default=None,
+        choices=list(MASK_PROPAGATION_MODES),
+        help='How masks reach the frames between detections: flow (warped by dense optical flow) '
+             'or hold (reused unchanged, fastest) (default: hold with --detection-scheduler motion, otherwise flow)'
+    )
+    
+    parser.add_argument(
+        '--detection-scheduler',
+        type=str,
+        default='fixed',
+        choices=list(DETECTION_SCHEDULERS),
+        help='Which video frames run human detection: fixed (every --detection-interval frames), adaptive '
+             '(on scene cuts and motion inside the masks) or motion (when the frame changed since the last detection, '
+             'for fixed cameras); adaptive and motion stay within --min/--max-detection-interval (default: fixed)'
+    )
+    
+    parser.add_argument(
+        '--min-detection-interval',
+        type=int,
+        default=1,
+        help='Minimum frames between detections for the adaptive and motion schedulers, scene cuts excepted (default: 1)'
+    )
+    
+    parser.add_argument(
+        '--max-detection-interval',
+        type=int,
+        default=30,
+        help='Maximum frames between detections (forced refresh) for the adaptive and motion schedulers (default: 30)'
+    )
+    
+    parser.add_argument(
+        '--motion-threshold',
+        type=float,
+        default=0.01,
+        help='Share of pixels that must change since the last detected frame before the motion scheduler detects again '
+             '(default: 0.01, range: 0.0-1.0)'
+    )
+    
+    parser.add_argument(
+        '--video-io',
+        type=str,
+        default='ffmpeg',
+        choices=list(VIDEO_IO_BACKENDS),
+        help='Video decoding/encoding: ffmpeg (subprocess pipes, audio copied in the same pass) or opencv '
+             '(mp4v, audio muxed afterwards); ffmpeg falls back to opencv when not installed (default: ffmpeg)'
+    )
+    
+    parser.add_argument(
+        '--video-codec',
+        type=str,
+        default='libx264',
+        help='ffmpeg video encoder for output videos, e.g. libx264, libx265, mpeg4 (default: libx264)'
+    )
+    
+    parser.add_argument(
+        '--preset',
+        type=str,
+        default='veryfast',
+        help='Encoder speed preset, e.g. ultrafast, veryfast, medium, slow for libx264 (default: veryfast)'
+    )
+    
+    parser.add_argument(
+        '--crf',
+        type=int,
+        default=23,
+        help='Encoder constant rate factor, lower = better quality and larger files (default: 23, range: 0-51)'
+    )
+    
     parser.add_argument(
         '-v', '--version',
         action='version',
@@ -1251,6 +3894,51 @@ Note: Audio preservation in videos requires ffmpeg to be installed.
         print("✗ Error: Confidence must be between 0.0 and 1.0")
         sys.exit(1)
     
+    if args.model not in MODEL_CHOICES and not args.model.endswith('.onnx') and not Path(args.model).is_dir():
+        print(f"✗ Error: Unknown model: {args.model}")
+        print(f"Choose from: {', '.join(MODEL_CHOICES)}, an exported .onnx file or an OpenVINO model directory")
+        sys.exit(1)
+    
+    if (args.precision == 'int8' or args.calibrate) and args.engine == 'torch':
+        print("✗ Error: INT8 precision and calibration require --engine onnx or --engine openvino")
+        sys.exit(1)
+    
+    if args.calibrate and not input_path.is_dir():
+        print("✗ Error: --calibrate expects a folder of sample images")
+        sys.exit(1)
+    
+    if args.batch_size < 1 or args.batch_size > 64:
+        print("✗ Error: Batch size must be between 1 and 64")
+        sys.exit(1)
+    
+    if args.queue_size < 1 or args.queue_size > 256:
+        print("✗ Error: Queue size must be between 1 and 256")
+        sys.exit(1)
+    
+    if args.workers < 1:
+        print("✗ Error: Workers must be at least 1")
+        sys.exit(1)
+    
+    if args.segments < 1:
+        print("✗ Error: Segments must be at least 1")
+        sys.exit(1)
+    
+    if args.crf < 0 or args.crf > 51:
+        print("✗ Error: CRF must be between 0 and 51")
+        sys.exit(1)
+    
+    if args.detection_interval < 1:
+        print("✗ Error: Detection interval must be at least 1")
+        sys.exit(1)
+    
+    if args.min_detection_interval < 1 or args.max_detection_interval < args.min_detection_interval:
+        print("✗ Error: Detection intervals must satisfy 1 <= --min-detection-interval <= --max-detection-interval")
+        sys.exit(1)
+    
+    if args.motion_threshold < 0.0 or args.motion_threshold > 1.0:
+        print("✗ Error: Motion threshold must be between 0.0 and 1.0")
+        sys.exit(1)
+    
     # Check HEIC support if needed
     if input_path.is_file() and input_path.suffix.lower() in {'.heic', '.heif'}:
         if not HEIC_SUPPORT:
@@ -1258,6 +3946,25 @@ Note: Audio preservation in videos requires ffmpeg to be installed.
             print("Install with: pip install pillow-heif")
             print()
     
+    if args.benchmark_blur:
+        # Benchmark the blur engines on one image or the first video frame
+        if input_path.suffix.lower() in HumanBlurProcessor.SUPPORTED_VIDEO_FORMATS:
+            cap = cv2.VideoCapture(str(input_path))
+            ret, image = cap.read()
+            cap.release()
+            image = image if ret else None
+        else:
+            image = cv2.imread(str(input_path)) if input_path.is_file() else None
+        if image is None:
+            print(f"✗ Error: Could not read an image or video frame from: {input_path}")
+            sys.exit(1)
+        
+        kernel_size = args.blur if args.blur % 2 == 1 else args.blur + 1
+        print(f"\nBlur engine benchmark: {image.shape[1]}x{image.shape[0]}, kernel={kernel_size}, passes={args.passes}\n")
+        for engine, result in benchmark_blur_engines(image, kernel_size, args.passes).items():
+            print(f"  {engine:<10} {result['ms']:>10.1f} ms   PSNR vs multi-pass Gaussian: {result['psnr']} dB")
+        return
+    
     # Determine if object detection should be enabled
     enable_detection = args.enable_detection and not args.disable_detection
     
@@ -1272,9 +3979,35 @@ Note: Audio preservation in videos requires ffmpeg to be installed.
         blur_passes=args.passes,
         mask_type=args.mask_type,
         enable_object_detection=enable_detection,
-        detection_model=args.detection_model
+        detection_model=args.detection_model,
+        batch_size=args.batch_size,
+        threaded_pipeline=args.threaded_pipeline,
+        pipeline_queue_size=args.queue_size,
+        workers=args.workers,
+        video_segments=args.segments,
+        inference_engine=args.engine,
+        precision='fp32' if args.calibrate else args.precision,
+        blur_engine=args.blur_engine,
+        morphology=args.morphology,
+        video_io=args.video_io,
+        video_codec=args.video_codec,
+        video_preset=args.preset,
+        video_crf=args.crf,
+        detection_interval=args.detection_interval,
+        mask_propagation=args.mask_propagation,
+        detection_scheduler=args.detection_scheduler,
+        min_detection_interval=args.min_detection_interval,
+        max_detection_interval=args.max_detection_interval,
+        motion_threshold=args.motion_threshold
     )
     
+    if args.calibrate:
+        print(f"\nCalibrating INT8 model from: {input_path}\n")
+        if processor.calibrate_int8(input_path, confidence=args.confidence) is None:
+            sys.exit(1)
+        print("\n✓ Calibration completed successfully!")
+        return
+    
     # Process based on input type
     if input_path.is_file():
         # Determine if it's an image or video
@@ -1313,4 +4046,5 @@ Note: Audio preservation in videos requires ffmpeg to be installed.
 
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()
     main()
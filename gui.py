@@ -904,7 +904,7 @@ class HumanBlurGUI:
                     
                     # Reset processor's detection and skin tone tracking for each file
                     processor.all_detections = []
-                    processor.skin_tone_samples = []
+                    processor.reset_skin_tracking()
                     
                     # Process based on file type
                     try:
@@ -0,0 +1,223 @@
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from blur_humans import load_inference_engine
+
+# Optional — used to evict cached models when system memory runs low
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+
+class SharedModel:
+    """Cached inference engine shared by concurrent jobs.
+
+    The torch (ultralytics predictor) and OpenVINO engines keep per-call state, so
+    predict calls are serialized with a per-model lock. Other attributes are passed through.
+    """
+
+    def __init__(self, model: Any):
+        self._model = model
+        self._inference_lock = threading.Lock()
+
+    def predict(self, *args: Any, **kwargs: Any) -> Any:
+        with self._inference_lock:
+            return self._model.predict(*args, **kwargs)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._model, name)
+
+
+class ModelRegistry:
+    """Process-wide cache of loaded YOLO models keyed by model name, inference engine and precision.
+
+    Models are loaded once and shared by every job. The least recently used
+    models are evicted when more than ``max_models`` are cached, or one per load
+    while the available system memory is below ``min_available_mb`` (requires
+    psutil). Models held by a running job (see ``lease``) are never
+    evicted. Loading happens outside the registry lock, so a slow load only
+    blocks the jobs waiting for that same model.
+    """
+
+    def __init__(self, max_models: int = 4, min_available_mb: int = 1024, loader: Callable[..., Any] = load_inference_engine):
+        self.max_models = max(1, max_models)
+        self.min_available_mb = min_available_mb
+        self._loader = loader
+        self._models: "OrderedDict[Tuple[str, str, str], Dict[str, Any]]" = OrderedDict()
+        self._loading: Dict[Tuple[str, str, str], Future] = {}
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._loads = 0
+        self._evictions = 0
+        self._load_seconds = 0.0
+
+    def get(self, model_name: str, engine: str = "torch", precision: str = "fp32", hold: bool = False) -> SharedModel:
+        """Return the cached model for (model_name, engine, precision), loading it on first use.
+
+        With ``hold`` the model is protected from eviction until ``release`` is called.
+        """
+        key = (model_name, engine, precision)
+        with self._lock:
+            entry = self._models.get(key)
+            if entry is not None:
+                self._touch(entry, key, hold)
+                self._hits += 1
+                return entry["model"]
+
+            future = self._loading.get(key)
+            loading = future is None
+            if loading:
+                future = self._loading[key] = Future()
+                # Make room before loading so peak memory stays bounded
+                self._evict(keep_free_slot=True)
+
+        if not loading:
+            # Another job is loading this model; wait for it without blocking the registry
+            future.result()
+            return self.get(model_name, engine, precision, hold)
+
+        try:
+            start = time.time()
+            model = SharedModel(self._loader(model_name, engine, precision=precision))
+            load_seconds = time.time() - start
+        except BaseException as e:
+            with self._lock:
+                self._loading.pop(key, None)
+            future.set_exception(e)
+            raise
+
+        with self._lock:
+            self._models[key] = {
+                "model": model,
+                "hits": 0,
+                "holders": 1 if hold else 0,
+                "load_seconds": load_seconds,
+                "loaded_at": time.time(),
+                "last_used": time.time(),
+            }
+            self._loading.pop(key, None)
+            self._loads += 1
+            self._load_seconds += load_seconds
+        future.set_result(model)
+        return model
+
+    def release(self, model_name: str, engine: str = "torch", precision: str = "fp32") -> None:
+        """Drop one hold taken by ``get(..., hold=True)``."""
+        with self._lock:
+            entry = self._models.get((model_name, engine, precision))
+            if entry is not None and entry["holders"] > 0:
+                entry["holders"] -= 1
+
+    def lease(self) -> "ModelLease":
+        """Model loader for one job; every model it returns is held until the lease is released."""
+        return ModelLease(self)
+
+    def evict(self, model_name: str, engine: str = "torch", precision: str = "fp32") -> bool:
+        """Drop a model from the cache. Returns True if it was cached."""
+        with self._lock:
+            if self._models.pop((model_name, engine, precision), None) is None:
+                return False
+            self._evictions += 1
+            return True
+
+    def clear(self) -> None:
+        with self._lock:
+            self._evictions += len(self._models)
+            self._models.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Cache hit/load counters and per-model details, most recently used last."""
+        with self._lock:
+            return {
+                "hits": self._hits,
+                "loads": self._loads,
+                "evictions": self._evictions,
+                "load_seconds": round(self._load_seconds, 3),
+                "max_models": self.max_models,
+                "available_mb": self._available_mb(),
+                "loading": [
+                    {"name": name, "engine": engine, "precision": precision}
+                    for name, engine, precision in self._loading
+                ],
+                "models": [
+                    {
+                        "name": name,
+                        "engine": engine,
+                        "precision": precision,
+                        "hits": entry["hits"],
+                        "holders": entry["holders"],
+                        "load_seconds": round(entry["load_seconds"], 3),
+                        "loaded_at": entry["loaded_at"],
+                        "last_used": entry["last_used"],
+                    }
+                    for (name, engine, precision), entry in self._models.items()
+                ],
+            }
+
+    def _touch(self, entry: Dict[str, Any], key: Tuple[str, str, str], hold: bool) -> None:
+        """Mark a cached model as used (and held). Caller holds the lock."""
+        self._models.move_to_end(key)
+        entry["hits"] += 1
+        entry["last_used"] = time.time()
+        if hold:
+            entry["holders"] += 1
+
+    def _evict(self, keep_free_slot: bool = False) -> None:
+        """Evict least recently used models that no job holds. Caller holds the lock.
+
+        Evicts what is needed to get under capacity, otherwise at most one model while
+        memory is low; memory is checked again on the next load, so a low-memory host
+        does not empty the whole cache in one go.
+        """
+        limit = self.max_models - 1 if keep_free_slot else self.max_models
+        evicted = False
+        while len(self._models) > limit:
+            if not self._evict_lru():
+                return
+            evicted = True
+        if not evicted and self._memory_is_low():
+            self._evict_lru()
+
+    def _evict_lru(self) -> bool:
+        """Evict the least recently used model no job holds. Caller holds the lock."""
+        for key, entry in self._models.items():
+            if entry["holders"] == 0:
+                del self._models[key]
+                self._evictions += 1
+                return True
+        return False
+
+    def _memory_is_low(self) -> bool:
+        available = self._available_mb()
+        return available is not None and available < self.min_available_mb
+
+    @staticmethod
+    def _available_mb() -> Optional[int]:
+        if psutil is None:
+            return None
+        return int(psutil.virtual_memory().available / (1024 * 1024))
+
+
+class ModelLease:
+    """Model loader for one job. Models it returns stay cached and are not evicted until ``release``."""
+
+    def __init__(self, registry: ModelRegistry):
+        self._registry = registry
+        self._held = []
+
+    def __call__(self, model_name: str, engine: str = "torch", precision: str = "fp32") -> SharedModel:
+        model = self._registry.get(model_name, engine, precision, hold=True)
+        self._held.append((model_name, engine, precision))
+        return model
+
+    def release(self) -> None:
+        while self._held:
+            self._registry.release(*self._held.pop())
+
+
+# Shared by all jobs in this backend process
+model_registry = ModelRegistry()
@@ -1,3 +1,5 @@
+from typing import Literal, Optional
+
 from pydantic import BaseModel
 
 
@@ -6,13 +8,33 @@ class ProcessRequest(BaseModel):
     mask_type: str = "black"            # "black" | "blur"
     blur_intensity: int = 151
     blur_passes: int = 3
+    blur_engine: Literal["gaussian", "box", "pyramid"] = "gaussian"
     confidence: float = 0.33
     model_name: str = "yolov8n-seg.pt"
     media_type: str = "both"            # "images" | "videos" | "both"
     keep_audio: bool = True
     filename_suffix: str = "-background"
     frame_interval: int = 1
+    detection_interval: int = 1         # detect humans every Nth frame, masks propagated in between
+    mask_propagation: Optional[Literal["flow", "hold"]] = None  # default: hold for the motion scheduler, else flow
+    detection_scheduler: Literal["fixed", "adaptive", "motion"] = "fixed"
+    min_detection_interval: int = 1     # adaptive / motion scheduler bounds
+    max_detection_interval: int = 30
+    motion_threshold: float = 0.01      # changed pixel share that re-runs detection (motion scheduler)
     enable_skin_detection: bool = False
+    max_skin_samples: int = 100         # recent skin tone samples the adaptive range is computed from
+    morphology: Literal["auto", "exact", "rect"] = "auto"  # mask dilation
+    batch_size: int = 1                 # video frames / images per inference call
+    threaded_pipeline: bool = False     # overlap decode / inference / masking / encode
+    pipeline_queue_size: int = 8
+    workers: int = 1                    # worker processes for folder jobs
+    video_segments: int = 1             # parallel keyframe-aligned parts per video
+    video_io: Literal["ffmpeg", "opencv"] = "ffmpeg"
+    video_codec: str = "libx264"        # ffmpeg encoder for output videos
+    video_preset: str = "veryfast"      # encoder speed preset
+    video_crf: int = 23                 # encoder quality, lower = better
+    inference_engine: Literal["torch", "onnx", "openvino"] = "torch"
+    precision: Literal["fp32", "int8"] = "fp32"  # int8: onnx/openvino, needs a calibrated model
 
 
 class StartJobResponse(BaseModel):
@@ -10,6 +10,7 @@ from fastapi import APIRouter, HTTPException
 from fastapi.responses import StreamingResponse
 
 from api.models import ProcessRequest, StartJobResponse, CancelResponse
+from api.model_registry import model_registry
 from blur_humans import HumanBlurProcessor
 
 router = APIRouter()
@@ -61,17 +62,41 @@ def _run_job(job_id: str, req: ProcessRequest) -> None:
             }))
         return cb
 
+    # Models this job loads stay cached (and are not evicted) until it ends
+    models = model_registry.lease()
+
     try:
         processor = HumanBlurProcessor(
             model_name=req.model_name,
             blur_intensity=req.blur_intensity,
             blur_passes=req.blur_passes,
+            blur_engine=req.blur_engine,
             mask_type=req.mask_type,
             filename_suffix=req.filename_suffix,
             keep_audio=req.keep_audio,
             frame_interval=req.frame_interval,
+            detection_interval=req.detection_interval,
+            mask_propagation=req.mask_propagation,
+            detection_scheduler=req.detection_scheduler,
+            min_detection_interval=req.min_detection_interval,
+            max_detection_interval=req.max_detection_interval,
+            motion_threshold=req.motion_threshold,
             enable_skin_detection=req.enable_skin_detection,
+            max_skin_samples=req.max_skin_samples,
+            morphology=req.morphology,
             progress_callback=progress_callback,
+            batch_size=req.batch_size,
+            threaded_pipeline=req.threaded_pipeline,
+            pipeline_queue_size=req.pipeline_queue_size,
+            workers=req.workers,
+            video_segments=req.video_segments,
+            video_io=req.video_io,
+            video_codec=req.video_codec,
+            video_preset=req.video_preset,
+            video_crf=req.video_crf,
+            model_loader=models,
+            inference_engine=req.inference_engine,
+            precision=req.precision,
         )
 
         if input_path.is_file():
@@ -128,35 +153,65 @@ def _run_job(job_id: str, req: ProcessRequest) -> None:
                 return
 
             successful = 0
-            for idx, file_path in enumerate(media_files, 1):
-                if job.cancelled:
-                    break
+            if req.workers > 1 and total_files > 1:
+                # Worker processes each load their own model; forward their events to the SSE stream
+                def forward_event(event: str, data: dict) -> None:
+                    if job.cancelled:
+                        return
+                    is_image = Path(data["file"]).suffix.lower() in supported_image
+                    if event == "file_start":
+                        job.queue.put(("file_start", {"file": data["file"], "index": data["index"], "total_files": total_files}))
+                        # Synthetic progress start for images
+                        if is_image:
+                            job.queue.put(("progress", {"current": 0, "total": 1, "file": data["file"], "percent": 0}))
+                    elif event == "progress":
+                        current, total = data["current"], data["total"]
+                        percent = (current / total * 100) if total > 0 else 0
+                        job.queue.put(("progress", {
+                            "current": current,
+                            "total": total,
+                            "file": data["file"],
+                            "percent": round(percent, 1),
+                        }))
+                    elif event == "file_complete" and is_image and data["success"]:
+                        job.queue.put(("progress", {"current": 1, "total": 1, "file": data["file"], "percent": 100}))
+
+                successful = processor.process_files_parallel(
+                    media_files,
+                    confidence=req.confidence,
+                    event_callback=forward_event,
+                    cancel_check=lambda: job.cancelled,
+                )
+            else:
+                for idx, file_path in enumerate(media_files, 1):
+                    if job.cancelled:
+                        break
 
-                # Reset processor state per file
-                processor.all_detections = []
-                processor.skin_tone_samples = []
+                    # Reset processor state per file
+                    processor.all_detections = []
+                    processor.reset_skin_tracking()
 
-                job.queue.put(("file_start", {"file": file_path.name, "index": idx, "total_files": total_files}))
+                    job.queue.put(("file_start", {"file": file_path.name, "index": idx, "total_files": total_files}))
 
-                ext = file_path.suffix.lower()
-                # Synthetic progress start for images
-                if ext in supported_image:
-                    job.queue.put(("progress", {"current": 0, "total": 1, "file": file_path.name, "percent": 0}))
+                    ext = file_path.suffix.lower()
+                    # Synthetic progress start for images
+                    if ext in supported_image:
+                        job.queue.put(("progress", {"current": 0, "total": 1, "file": file_path.name, "percent": 0}))
 
-                processor.progress_callback = make_progress_callback(file_path)
+                    processor.progress_callback = make_progress_callback(file_path)
 
-                try:
-                    if ext in supported_image:
-                        success = processor.process_image(file_path, confidence=req.confidence)
-                        if success:
-                            job.queue.put(("progress", {"current": 1, "total": 1, "file": file_path.name, "percent": 100}))
-                    else:
-                        success = processor.process_video(file_path, confidence=req.confidence)
+                    try:
+                        if ext in supported_image:
+                            success = processor.process_image(file_path, confidence=req.confidence)
+                            if success:
+                                job.queue.put(("progress", {"current": 1, "total": 1, "file": file_path.name, "percent": 100}))
+                        else:
+                            success = processor.process_video(file_path, confidence=req.confidence)
 
-                    if success:
-                        successful += 1
-                except Exception as e:
-                    print(f"Error processing {file_path}: {e}")
+                        if success:
+                            successful += 1
+                    except Exception as e:
+                        print(f"Error processing {file_path}: {e}")
 
             job.queue.put(("complete", {
                 "successful": successful,
@@ -171,6 +226,7 @@ def _run_job(job_id: str, req: ProcessRequest) -> None:
         traceback.print_exc()
         job.queue.put(("error", {"message": str(e)}))
     finally:
+        models.release()
         job.status = "complete"
 
 
@@ -224,3 +280,9 @@ async def cancel_job(job_id: str) -> CancelResponse:
         raise HTTPException(status_code=404, detail="Job not found")
     jobs[job_id].cancelled = True
     return CancelResponse(cancelled=True)
+
+
+@router.get("/models/stats")
+async def model_stats() -> dict:
+    """Warm model cache statistics (hits, loads, evictions, cached models)."""
+    return model_registry.stats()
@@ -1,5 +1,6 @@
 import sys
 import argparse
+import multiprocessing
 import uvicorn
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
@@ -24,6 +25,9 @@ async def health_check():
 
 
 if __name__ == "__main__":
+    # Required for worker processes in the frozen (PyInstaller) backend
+    multiprocessing.freeze_support()
+
     parser = argparse.ArgumentParser()
     parser.add_argument("--port", type=int, default=8766)
     args = parser.parse_args()